@@ -1,102 +1,180 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from collections import defaultdict
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+import orjson
 import re
-import time
-from utils import safe_request, generate_embedding
-
-
-def extract_company_name(soup: BeautifulSoup, url: str) -> str:
+from utils import safe_request, generate_embedding, HTML_PARSER
+
+# Number of pages fetched concurrently during competitor analysis
+MAX_WORKERS = 8
+
+# Aho-Corasick gives a single-pass multi-competitor mention search when installed
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Only the tags read by the competitor extractors are parsed from competitor pages.
+# Script tags are only needed when the page embeds JSON-LD.
+COMPETITOR_TAGS = ['meta', 'title', 'img', 'div', 'section', 'p', 'h1', 'h2', 'h3']
+COMPETITOR_STRAINER = SoupStrainer(['script'] + COMPETITOR_TAGS)
+COMPETITOR_STRAINER_NO_SCRIPT = SoupStrainer(COMPETITOR_TAGS)
+
+# Precompiled patterns used by the extractors below
+RE_TAGLINE_DASHPIPE = re.compile(r'\s*[-|]\s*.+$')
+RE_TAGLINE_COLON = re.compile(r'\s*[-|:]\s*.+$')
+RE_COMMON_TITLE_WORDS = re.compile(
+    r'\b(Home|Official Site|Welcome to)\b', re.IGNORECASE)
+RE_LOGO_CLASS = re.compile(r'(logo|brand)', re.I)
+RE_LOGO_WORDS = re.compile(r'\b(logo|brand|image)\b', re.IGNORECASE)
+RE_DOMAIN = re.compile(r'https?://(?:www\.)?([^/]+)')
+RE_TLD = re.compile(r'\.(com|org|net|io|ai|co|us|gov|edu)$')
+RE_WORDS = re.compile(r'[a-zA-Z][a-z]*')
+RE_ABOUT = re.compile(r'about', re.I)
+RE_FEATURE_SECTIONS = [re.compile(pattern, re.I) for pattern in
+                       ['feature', 'solution', 'product', 'service', 'benefit']]
+RE_WHITESPACE = re.compile(r'\s+')
+RE_PAREN = re.compile(r'\s*\(.*?\)')
+# Schema.org types that describe the company itself
+ORG_SCHEMA_TYPES = ['Organization', 'Corporation', 'Company']
+RE_ORG_SCHEMA_TYPE = re.compile(
+    '|'.join(f'"{schema_type}"' for schema_type in ORG_SCHEMA_TYPES))
+# Keywords marking target pages likely to mention competitors (partners, integrations, etc.)
+RE_RELEVANT_PAGE = re.compile(
+    r'partner|integrat|app|marketplace|ecosystem|connect|plugin|extension|'
+    r'comparison|vs|alternative|technology|stack|api', re.I)
+
+
+def index_tags(soup: BeautifulSoup) -> Dict[str, List[Tag]]:
+    """Group all tags of a page by name in a single traversal.
+
+    Tags keep document order. `div` and `section` tags are also collected
+    together under the `block` key."""
+    tags = defaultdict(list)
+    for tag in soup.find_all(True):
+        tags[tag.name].append(tag)
+        if tag.name in ('div', 'section'):
+            tags['block'].append(tag)
+    return tags
+
+
+def attr_matches(tag: Tag, attr: str, pattern: re.Pattern) -> bool:
+    """Check whether a tag attribute (e.g. id or class) matches a pattern."""
+    value = tag.get(attr)
+    if value is None:
+        return False
+    if isinstance(value, list):
+        value = ' '.join(value)
+    return pattern.search(value) is not None
+
+
+def extract_company_name(soup: BeautifulSoup, url: str, tags: Optional[Dict[str, List[Tag]]] = None) -> str:
     """Extract the core company name from a website, avoiding taglines and descriptions."""
+    if tags is None:
+        tags = index_tags(soup)
 
     # Extract from org schema if available (most reliable)
     org_schema = None
-    for script in soup.find_all('script', type='application/ld+json'):
+    for script in tags['script']:
+        if script.get('type') != 'application/ld+json':
+            continue
+        # Skip the JSON parse for schemas that cannot describe an organization
+        script_text = script.string
+        if not script_text or not RE_ORG_SCHEMA_TYPE.search(script_text):
+            continue
         try:
-            data = json.loads(script.string)
-            if isinstance(data, dict) and data.get('@type') in ['Organization', 'Corporation', 'Company']:
+            data = orjson.loads(script_text)
+            if isinstance(data, dict) and data.get('@type') in ORG_SCHEMA_TYPES:
                 org_schema = data
                 break
             # Handle array of schemas
             elif isinstance(data, list):
                 for item in data:
-                    if isinstance(item, dict) and item.get('@type') in ['Organization', 'Corporation', 'Company']:
+                    if isinstance(item, dict) and item.get('@type') in ORG_SCHEMA_TYPES:
                         org_schema = item
                         break
-        except:
+        except (orjson.JSONDecodeError, TypeError):
             continue
 
     if org_schema and 'name' in org_schema:
         return org_schema['name']
 
     # Try extracting from meta tags with company/org name
-    meta_org = soup.find('meta', property='og:site_name')
+    meta_org = next((meta for meta in tags['meta']
+                     if meta.get('property') == 'og:site_name'), None)
     if meta_org and meta_org.get('content'):
         org_name = meta_org.get('content').strip()
         # Remove common tagline patterns
-        org_name = re.sub(r'\s*[-|]\s*.+$', '', org_name)
+        org_name = RE_TAGLINE_DASHPIPE.sub('', org_name)
         if len(org_name) > 2:  # Avoid empty or very short names
             return org_name
 
     # Try to get from title tag (but clean it up)
-    title = soup.find('title')
+    title = tags['title'][0] if tags['title'] else None
     if title:
         title_text = title.get_text().strip()
         # Remove common tagline patterns
-        title_text = re.sub(r'\s*[-|:]\s*.+$', '', title_text)
+        title_text = RE_TAGLINE_COLON.sub('', title_text)
         # Remove common words like "Home", "Official Site", etc.
-        title_text = re.sub(r'\b(Home|Official Site|Welcome to)\b',
-                            '', title_text, flags=re.IGNORECASE).strip()
+        title_text = RE_COMMON_TITLE_WORDS.sub('', title_text).strip()
         if len(title_text) > 2:
             return title_text
 
     # Try to get from logo alt text
-    logo = soup.find('img', class_=re.compile(r'(logo|brand)', re.I))
+    logo = next((img for img in tags['img']
+                 if attr_matches(img, 'class', RE_LOGO_CLASS)), None)
     if logo and logo.get('alt'):
         logo_text = logo.get('alt').strip()
         # Remove common words like "logo"
-        logo_text = re.sub(r'\b(logo|brand|image)\b', '',
-                           logo_text, flags=re.IGNORECASE).strip()
+        logo_text = RE_LOGO_WORDS.sub('', logo_text).strip()
         if len(logo_text) > 2:
             return logo_text
 
     # Extract domain name as fallback, but make it more presentable
-    domain_match = re.search(r'https?://(?:www\.)?([^/]+)', url)
+    domain_match = RE_DOMAIN.search(url)
     if domain_match:
         domain = domain_match.group(1)
         # Handle common TLDs
-        domain_name = re.sub(
-            r'\.(com|org|net|io|ai|co|us|gov|edu)$', '', domain.split('.')[0])
+        domain_name = RE_TLD.sub('', domain.split('.')[0])
         # Convert to title case and fix spacing for multi-word domains
         domain_name = ' '.join(word.capitalize()
-                               for word in re.findall(r'[a-zA-Z][a-z]*', domain_name))
+                               for word in RE_WORDS.findall(domain_name))
         return domain_name
 
     return "Unknown Company"
 
 
-def extract_company_description(soup: BeautifulSoup, url: str) -> str:
+def extract_company_description(soup: BeautifulSoup, url: str, tags: Optional[Dict[str, List[Tag]]] = None) -> str:
     """Extract company description from meta tags or about section."""
+    if tags is None:
+        tags = index_tags(soup)
+
     # Try meta description
-    meta_desc = soup.find('meta', {'name': 'description'})
+    meta_desc = next((meta for meta in tags['meta']
+                      if meta.get('name') == 'description'), None)
     if meta_desc and meta_desc.get('content'):
         return meta_desc.get('content').strip()
 
     # Try og:description
-    og_desc = soup.find('meta', {'property': 'og:description'})
+    og_desc = next((meta for meta in tags['meta']
+                    if meta.get('property') == 'og:description'), None)
     if og_desc and og_desc.get('content'):
         return og_desc.get('content').strip()
 
     # Try to find description in about section
-    about_section = soup.find(
-        ['div', 'section'], id=re.compile(r'about', re.I))
+    about_section = next((block for block in tags['block']
+                          if attr_matches(block, 'id', RE_ABOUT)), None)
     if about_section:
-        paragraphs = about_section.find_all('p')
-        if paragraphs:
-            return paragraphs[0].get_text().strip()
+        paragraph = about_section.find('p')
+        if paragraph:
+            return paragraph.get_text().strip()
 
     # Extract the first substantial paragraph from the page
-    for p in soup.find_all('p'):
+    for p in tags['p']:
         text = p.get_text().strip()
         if len(text) > 100:  # Only consider substantial paragraphs
             return text
@@ -104,18 +182,38 @@ def extract_company_description(soup: BeautifulSoup, url: str) -> str:
     return "No description available"
 
 
-def extract_main_features(soup: BeautifulSoup, url: str) -> str:
+def build_next_paragraph_map(soup: BeautifulSoup) -> Dict[int, Tag]:
+    """Map each h1-h3 heading (by id) to the first paragraph after it in document order.
+
+    Equivalent to calling heading.find_next('p') for every heading, in a single pass."""
+    next_paragraph = {}
+    pending_headings = []
+    for tag in soup.find_all(['h1', 'h2', 'h3', 'p']):
+        if tag.name == 'p':
+            for heading in pending_headings:
+                next_paragraph[id(heading)] = tag
+            pending_headings = []
+        else:
+            pending_headings.append(tag)
+    return next_paragraph
+
+
+def extract_main_features(soup: BeautifulSoup, url: str, tags: Optional[Dict[str, List[Tag]]] = None) -> str:
     """Extract main features or solutions from the website."""
+    if tags is None:
+        tags = index_tags(soup)
+
     # Look for features/solutions sections
     feature_sections = []
 
     # Try to find by ID or class
-    for pattern in ['feature', 'solution', 'product', 'service', 'benefit']:
-        elements = soup.find_all(
-            ['div', 'section'], id=re.compile(pattern, re.I))
-        elements.extend(soup.find_all(
-            ['div', 'section'], class_=re.compile(pattern, re.I)))
-        feature_sections.extend(elements)
+    for pattern in RE_FEATURE_SECTIONS:
+        feature_sections.extend(
+            block for block in tags['block'] if attr_matches(block, 'id', pattern))
+        feature_sections.extend(
+            block for block in tags['block'] if attr_matches(block, 'class', pattern))
+
+    next_paragraph = build_next_paragraph_map(soup)
 
     # Extract content from these sections
     features_content = ""
@@ -125,97 +223,128 @@ def extract_main_features(soup: BeautifulSoup, url: str) -> str:
         for heading in headings:
             features_content += f"{heading.get_text().strip()}: "
             # Get the paragraph after this heading
-            next_p = heading.find_next('p')
+            next_p = next_paragraph.get(id(heading))
             if next_p:
                 features_content += f"{next_p.get_text().strip()}\n"
 
     # If we couldn't find structured features, try all h2 + p combinations
     if not features_content:
-        h2_elements = soup.find_all('h2')
-        for h2 in h2_elements[:3]:  # Limit to first 3 to avoid getting too much
+        for h2 in tags['h2'][:3]:  # Limit to first 3 to avoid getting too much
             features_content += f"{h2.get_text().strip()}: "
-            next_p = h2.find_next('p')
+            next_p = next_paragraph.get(id(h2))
             if next_p:
                 features_content += f"{next_p.get_text().strip()}\n"
 
     return features_content if features_content else "No feature information available"
 
 
-def extract_key_differentiators(company_name: str) -> str:
-    """Provide insights about known competitors based on company name."""
-    # Dictionary of known competitors and their key differentiators
-    known_companies = {
-        "Salesforce": "Salesforce is the market leader in CRM with a comprehensive platform, extensive ecosystem, and robust AI capabilities (Einstein). They offer a wide range of integrated products but can be complex and expensive for smaller businesses.",
+# Known competitors and their key differentiators (read-only)
+_KNOWN_COMPANIES = MappingProxyType({
+    "Salesforce": "Salesforce is the market leader in CRM with a comprehensive platform, extensive ecosystem, and robust AI capabilities (Einstein). They offer a wide range of integrated products but can be complex and expensive for smaller businesses.",
 
-        "HubSpot": "HubSpot offers an all-in-one marketing, sales, and service platform with a focus on inbound methodology. They provide a generous free tier, user-friendly interface, and strong content marketing tools, but may lack some advanced features of enterprise solutions.",
+    "HubSpot": "HubSpot offers an all-in-one marketing, sales, and service platform with a focus on inbound methodology. They provide a generous free tier, user-friendly interface, and strong content marketing tools, but may lack some advanced features of enterprise solutions.",
 
-        "Zendesk": "Zendesk excels in customer service and help desk functionality with intuitive ticket management. They offer omnichannel support capabilities and flexible pricing, but their sales CRM capabilities are less mature than dedicated CRM platforms.",
+    "Zendesk": "Zendesk excels in customer service and help desk functionality with intuitive ticket management. They offer omnichannel support capabilities and flexible pricing, but their sales CRM capabilities are less mature than dedicated CRM platforms.",
 
-        "Zoho": "Zoho CRM is known for affordability and extensive integration with Zoho's productivity suite. They offer strong customization options and international support, but may have a steeper learning curve and less polished UI than some competitors.",
+    "Zoho": "Zoho CRM is known for affordability and extensive integration with Zoho's productivity suite. They offer strong customization options and international support, but may have a steeper learning curve and less polished UI than some competitors.",
 
-        "Microsoft Dynamics": "Microsoft Dynamics 365 offers deep integration with Microsoft products (Office 365, Teams, etc.) and strong enterprise capabilities. It provides powerful customization through Power Platform but can be complex to implement and use.",
+    "Microsoft Dynamics": "Microsoft Dynamics 365 offers deep integration with Microsoft products (Office 365, Teams, etc.) and strong enterprise capabilities. It provides powerful customization through Power Platform but can be complex to implement and use.",
 
-        "Oracle": "Oracle CX Cloud Suite provides enterprise-grade solutions with strong database integration and analytics. They offer comprehensive industry-specific solutions but can be expensive and complex to implement.",
+    "Oracle": "Oracle CX Cloud Suite provides enterprise-grade solutions with strong database integration and analytics. They offer comprehensive industry-specific solutions but can be expensive and complex to implement.",
 
-        "SAP": "SAP Customer Experience (formerly C/4HANA) delivers robust enterprise solutions with strong ERP integration. They excel in data management and business process optimization but require significant implementation resources.",
+    "SAP": "SAP Customer Experience (formerly C/4HANA) delivers robust enterprise solutions with strong ERP integration. They excel in data management and business process optimization but require significant implementation resources.",
 
-        "Pipedrive": "Pipedrive focuses on sales pipeline management with an intuitive visual interface. They offer strong sales-focused features and activity-based selling methodology but have more limited marketing and service capabilities.",
+    "Pipedrive": "Pipedrive focuses on sales pipeline management with an intuitive visual interface. They offer strong sales-focused features and activity-based selling methodology but have more limited marketing and service capabilities.",
 
-        "Freshworks": "Freshworks (Freshsales) provides affordable, user-friendly CRM with strong automation. They offer quick implementation and good customer support but may lack some advanced enterprise features.",
+    "Freshworks": "Freshworks (Freshsales) provides affordable, user-friendly CRM with strong automation. They offer quick implementation and good customer support but may lack some advanced enterprise features.",
 
-        "Atlassian": "Atlassian's products (particularly Jira, Confluence, and OpsGenie) are known for robust issue tracking, extensive integrations, and strong collaboration features. Their solutions are developer-centric with flexible workflows, though they can have a steep learning curve.",
+    "Atlassian": "Atlassian's products (particularly Jira, Confluence, and OpsGenie) are known for robust issue tracking, extensive integrations, and strong collaboration features. Their solutions are developer-centric with flexible workflows, though they can have a steep learning curve.",
 
-        "PagerDuty": "PagerDuty is a digital operations management platform that helps organizations respond to incidents and outages. It's known for reliable alerting, flexible routing rules, and extensive integration capabilities.",
+    "PagerDuty": "PagerDuty is a digital operations management platform that helps organizations respond to incidents and outages. It's known for reliable alerting, flexible routing rules, and extensive integration capabilities.",
 
-        "Zenduty": "Zenduty is an incident management platform focused on alerting, on-call scheduling, and incident response. It offers competitive pricing and core features similar to PagerDuty but may have a smaller ecosystem of integrations.",
-    }
+    "Zenduty": "Zenduty is an incident management platform focused on alerting, on-call scheduling, and incident response. It offers competitive pricing and core features similar to PagerDuty but may have a smaller ecosystem of integrations.",
+})
 
+# Known companies keyed by lowercased name
+_KNOWN_COMPANIES_LOWER = MappingProxyType(
+    {key.lower(): value for key, value in _KNOWN_COMPANIES.items()})
+# Position of each known company in the table; earlier entries win when several match
+_KNOWN_COMPANY_ORDER = MappingProxyType(
+    {key: index for index, key in enumerate(_KNOWN_COMPANIES_LOWER)})
+# Single pattern matching any known company name in a lowercased company name; the
+# lookahead finds overlapping names too, not just the leftmost one
+RE_KNOWN_COMPANIES = re.compile(
+    '(?=(' + '|'.join(re.escape(key) for key in _KNOWN_COMPANIES_LOWER) + '))')
+
+
+def extract_key_differentiators(company_name: str) -> str:
+    """Provide insights about known competitors based on company name."""
     # Check if we have information about this competitor
-    for key, value in known_companies.items():
-        if key.lower() in company_name.lower():
-            return value
+    # Scan the name once and keep the match listed first in the table
+    matches = {match.group(1) for match in RE_KNOWN_COMPANIES.finditer(company_name.lower())}
+    if matches:
+        return _KNOWN_COMPANIES_LOWER[min(matches, key=_KNOWN_COMPANY_ORDER.__getitem__)]
 
     # Generic response if company not found
     return "This competitor's differentiators are not specifically identified in our database."
 
 
-def find_all_competitor_mentions(company_content: str, competitor_name: str) -> List[Dict[str, Any]]:
-    """Find all mentions of competitors on the target company website with context."""
+def get_name_variants(competitor_name: str) -> List[str]:
+    """Return the lowercase forms of a competitor name to search for."""
+    # Extract company name without any parenthetical information
+    competitor_name_lower = RE_PAREN.sub('', competitor_name).strip().lower()
+
+    # Various forms of the competitor name to check
+    name_variants = []
+    for variant in [competitor_name_lower,
+                    competitor_name_lower.replace(' ', ''),  # No spaces
+                    competitor_name_lower.replace('.com', '')]:  # Without domain
+        if variant and variant not in name_variants:
+            name_variants.append(variant)
+
+    return name_variants
+
+
+def get_mention_context(company_content: str, index: int, length: int) -> str:
+    """Get the cleaned-up context around a mention (100 chars before and after)."""
+    start = max(0, index - 100)
+    end = min(len(company_content), index + length + 100)
+    context = company_content[start:end]
+
+    # Clean up the context; \s covers newlines, so one substitution collapses everything
+    return RE_WHITESPACE.sub(' ', context).strip()
+
+
+def find_all_competitor_mentions(company_content: str, competitor_name: str,
+                                 company_content_lower: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Find all mentions of competitors on the target company website with context.
+
+    Pass `company_content_lower` when searching the same content for several
+    competitors so it is only lowercased once."""
     mentions = []
+    seen_contexts = set()
 
-    # Extract company name without any parenthetical information
-    base_name = re.sub(r'\s*\(.*?\)', '', competitor_name).strip()
+    # Nothing to search, e.g. when the target site could not be scraped
+    if not company_content:
+        return mentions
 
     # Normalize text for comparison
-    company_content_lower = company_content.lower()
-    competitor_name_lower = base_name.lower()
-
-    # Various forms of the competitor name to check
-    name_variants = [
-        competitor_name_lower,
-        competitor_name_lower.replace(' ', ''),  # No spaces
-        competitor_name_lower.replace('.com', '')  # Without domain
-    ]
+    if company_content_lower is None:
+        company_content_lower = company_content.lower()
 
     # Find all occurrences of each variant
-    for variant in name_variants:
+    for variant in get_name_variants(competitor_name):
         start_pos = 0
         while True:
             index = company_content_lower.find(variant, start_pos)
             if index == -1:
                 break
 
-            # Get context around the mention (100 chars before and after)
-            start = max(0, index - 100)
-            end = min(len(company_content), index + len(variant) + 100)
-            context = company_content[start:end]
-
-            # Clean up the context
-            context = context.replace('\n', ' ').replace('\r', ' ')
-            context = re.sub(r'\s+', ' ', context).strip()
+            context = get_mention_context(company_content, index, len(variant))
 
             # Add to mentions if not a duplicate
-            if context not in [m.get('context') for m in mentions]:
+            if context not in seen_contexts:
+                seen_contexts.add(context)
                 mentions.append({
                     'variant': variant,
                     'context': f"...{context}..."
@@ -227,137 +356,206 @@ def find_all_competitor_mentions(company_content: str, competitor_name: str) ->
     return mentions
 
 
-def get_competitor_mentions(company_url: str, competitors: List[str]) -> Dict[str, Any]:
-    """Analyze competitor info and check for mentions on the target company website."""
-    analysis_results = {
-        "company_url": company_url,
-        "competitors": {},
-    }
+def find_competitor_mentions_multi(company_content: str, company_content_lower: str,
+                                   competitor_names: Dict[str, str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Find mentions of several competitors in a single pass using an Aho-Corasick automaton."""
+    mentions = {key: [] for key in competitor_names}
+    seen_contexts = {key: set() for key in competitor_names}
 
-    # Get company content for searching competitor mentions
-    print(f"Scraping content from target company: {company_url}")
-    company_response = safe_request(company_url)
-    company_content = ""
+    # Map each name variant to the competitors it belongs to
+    variant_owners = {}
+    for key, name in competitor_names.items():
+        for variant in get_name_variants(name):
+            variant_owners.setdefault(variant, []).append(key)
 
-    # Try to get content from multiple pages for more thorough mention analysis
-    if company_response:
-        company_soup = BeautifulSoup(company_response.content, 'html.parser')
-        company_content = company_soup.get_text()
+    # Skip building the automaton when there is nothing to search for or in
+    if not variant_owners or not company_content_lower:
+        return mentions
 
-        # Also try to find and scrape important pages like partners, integrations, etc.
-        important_pages = []
+    automaton = ahocorasick.Automaton()
+    for variant, owners in variant_owners.items():
+        automaton.add_word(variant, (variant, owners))
+    automaton.make_automaton()
 
-        # Find links to potentially relevant pages
-        for a_tag in company_soup.find_all('a', href=True):
-            href = a_tag.get('href')
-            text = a_tag.get_text().lower()
+    for end_index, (variant, owners) in automaton.iter(company_content_lower):
+        index = end_index - len(variant) + 1
+        context = get_mention_context(company_content, index, len(variant))
 
-            # Skip external links and anchors
-            if href.startswith('#') or (href.startswith('http') and company_url not in href):
-                continue
-
-            # Check for relevant keywords in link text or URL
-            relevant_keywords = ['partner', 'integrat', 'app', 'marketplace', 'ecosystem',
-                                 'connect', 'plugin', 'extension', 'comparison', 'vs',
-                                 'alternative', 'technology', 'stack', 'api']
-
-            if any(keyword in text or keyword in href.lower() for keyword in relevant_keywords):
-                # Handle relative URLs
-                if href.startswith('/'):
-                    full_url = '/'.join(company_url.split('/')[:3]) + href
-                elif not href.startswith('http'):
-                    full_url = company_url.rstrip('/') + '/' + href.lstrip('/')
-                else:
-                    full_url = href
-
-                if full_url not in important_pages:
-                    important_pages.append(full_url)
-
-        # Limit to 3 additional pages to avoid too many requests
-        for page_url in important_pages[:3]:
-            try:
-                print(f"Checking additional page for mentions: {page_url}")
-                page_response = safe_request(page_url)
-                if page_response:
-                    page_soup = BeautifulSoup(
-                        page_response.content, 'html.parser')
-                    company_content += "\n" + page_soup.get_text()
-                time.sleep(0.5)  # Small delay to avoid rate limiting
-            except Exception as e:
-                print(f"Error scraping additional page {page_url}: {str(e)}")
-
-    # Process each competitor
-    for competitor_url in competitors:
-        if not competitor_url.strip():
-            continue
-
-        try:
-            # Standardize URL format
-            if not competitor_url.startswith(('http://', 'https://')):
-                competitor_url = 'https://' + competitor_url
-
-            print(f"Analyzing competitor: {competitor_url}")
-            response = safe_request(competitor_url)
-            if not response:
-                analysis_results["competitors"][competitor_url] = {
-                    "url": competitor_url,
-                    "name": "Could not access website",
-                    "description": "Failed to retrieve data",
-                    "main_features": "",
-                    "mentions": []
-                }
+        for key in owners:
+            # Add to mentions if not a duplicate
+            if context in seen_contexts[key]:
                 continue
+            seen_contexts[key].add(context)
+            mentions[key].append({
+                'variant': variant,
+                'context': f"...{context}..."
+            })
 
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Extract company name
-            name = extract_company_name(soup, competitor_url)
-
-            # Extract description
-            description = extract_company_description(soup, competitor_url)
+    return mentions
 
-            # Extract main features/solutions
-            main_features = extract_main_features(soup, competitor_url)
 
-            # Get key differentiators
-            differentiators = extract_key_differentiators(name)
+def scrape_page_text(page_url: str) -> str:
+    """Scrape the visible text of an additional page on the target company website."""
+    try:
+        print(f"Checking additional page for mentions: {page_url}")
+        page_response = safe_request(page_url)
+        if page_response:
+            page_soup = BeautifulSoup(page_response.content, HTML_PARSER)
+            return page_soup.get_text(separator=' ', strip=True)
+    except Exception as e:
+        print(f"Error scraping additional page {page_url}: {str(e)}")
+    return ""
+
+
+def analyze_competitor(competitor_url: str) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Scrape a competitor website and extract its profile.
+
+    Returns the competitor data and the extracted company name, or None as the
+    name if the website could not be analyzed."""
+    try:
+        print(f"Analyzing competitor: {competitor_url}")
+        response = safe_request(competitor_url)
+        if not response:
+            return {
+                "url": competitor_url,
+                "name": "Could not access website",
+                "description": "Failed to retrieve data",
+                "main_features": "",
+                "mentions": []
+            }, None
+
+        # A raw byte search is far cheaper than looking for JSON-LD in the parsed tree
+        if b'application/ld+json' in response.content:
+            strainer = COMPETITOR_STRAINER
+        else:
+            strainer = COMPETITOR_STRAINER_NO_SCRIPT
+        soup = BeautifulSoup(response.content, HTML_PARSER, parse_only=strainer)
+        tags = index_tags(soup)
+
+        # Extract company name
+        name = extract_company_name(soup, competitor_url, tags)
+
+        # Extract description
+        description = extract_company_description(soup, competitor_url, tags)
+
+        # Extract main features/solutions
+        main_features = extract_main_features(soup, competitor_url, tags)
+
+        # Get key differentiators
+        differentiators = extract_key_differentiators(name)
+
+        # Store competitor data; mentions are filled in once all names are known
+        competitor_data = {
+            "url": competitor_url,
+            "name": name,
+            "description": description[:500] if description else "No description available",
+            "main_features": main_features[:800] if main_features else "No feature information available",
+            "differentiators": differentiators,
+            "mentions": []
+        }
+        return competitor_data, name
+
+    except Exception as e:
+        print(f"Error processing {competitor_url}: {str(e)}")
+        return {
+            "url": competitor_url,
+            "name": "Error",
+            "description": f"Error processing: {str(e)}",
+            "main_features": "",
+            "mentions": []
+        }, None
 
-            # Find ALL mentions of this competitor on the target company site
-            all_mentions = find_all_competitor_mentions(company_content, name)
 
-            # Format mentions for display
-            formatted_mentions = []
-            if all_mentions:
-                formatted_mentions.append(
-                    f"Found {len(all_mentions)} mention(s) of {name} on the {company_url} website")
-                for mention in all_mentions:
-                    formatted_mentions.append(f"Context: {mention['context']}")
-            else:
-                formatted_mentions.append(
-                    f"No mentions of {name} found on the {company_url} website")
+def get_competitor_mentions(company_url: str, competitors: List[str]) -> Dict[str, Any]:
+    """Analyze competitor info and check for mentions on the target company website."""
+    analysis_results = {
+        "company_url": company_url,
+        "competitors": {},
+    }
 
-            # Store competitor data
-            competitor_data = {
-                "url": competitor_url,
-                "name": name,
-                "description": description[:500] if description else "No description available",
-                "main_features": main_features[:800] if main_features else "No feature information available",
-                "differentiators": differentiators,
-                "mentions": formatted_mentions
-            }
+    # Standardize URL format
+    competitor_urls = []
+    for competitor_url in competitors:
+        if not competitor_url.strip():
+            continue
+        if not competitor_url.startswith(('http://', 'https://')):
+            competitor_url = 'https://' + competitor_url
+        competitor_urls.append(competitor_url)
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        # Start scraping competitors right away so they overlap with the target company requests
+        competitor_futures = [executor.submit(analyze_competitor, competitor_url)
+                              for competitor_url in competitor_urls]
+
+        # Get company content for searching competitor mentions
+        print(f"Scraping content from target company: {company_url}")
+        company_response = safe_request(company_url)
+        content_parts = []
+
+        # Try to get content from multiple pages for more thorough mention analysis
+        if company_response:
+            company_soup = BeautifulSoup(company_response.content, HTML_PARSER)
+            content_parts.append(
+                company_soup.get_text(separator=' ', strip=True))
+
+            # Also try to find and scrape important pages like partners, integrations, etc.
+            important_pages = []
+
+            # Find links to potentially relevant pages
+            for a_tag in company_soup.find_all('a', href=True):
+                href = a_tag.get('href')
+
+                # Skip external links and anchors
+                if href.startswith('#') or (href.startswith('http') and company_url not in href):
+                    continue
+
+                # Check for relevant keywords in link text or URL
+                if RE_RELEVANT_PAGE.search(href) or RE_RELEVANT_PAGE.search(a_tag.get_text()):
+                    # Handle relative URLs
+                    full_url = urljoin(company_url, href)
+                    if not full_url.startswith(('http://', 'https://')):
+                        continue
+
+                    if full_url not in important_pages:
+                        important_pages.append(full_url)
+
+            # Limit to 3 additional pages to avoid too many requests
+            for page_text in executor.map(scrape_page_text, important_pages[:3]):
+                if page_text:
+                    content_parts.append(page_text)
+
+        company_content = "\n".join(content_parts)
+
+        # Collect competitor results in input order
+        competitor_names = {}
+        for competitor_url, future in zip(competitor_urls, competitor_futures):
+            competitor_data, name = future.result()
             analysis_results["competitors"][competitor_url] = competitor_data
+            if name:
+                competitor_names[competitor_url] = name
 
-            # Add a small delay to avoid rate limiting
-            time.sleep(0.5)
-
-        except Exception as e:
-            print(f"Error processing {competitor_url}: {str(e)}")
-            analysis_results["competitors"][competitor_url] = {
-                "url": competitor_url,
-                "name": "Error",
-                "description": f"Error processing: {str(e)}",
-                "main_features": "",
-                "mentions": []
-            }
+    # Find ALL mentions of each competitor on the target company site
+    company_content_lower = company_content.lower()
+    if ahocorasick is not None:
+        all_mentions = find_competitor_mentions_multi(
+            company_content, company_content_lower, competitor_names)
+    else:
+        all_mentions = {competitor_url: find_all_competitor_mentions(company_content, name, company_content_lower)
+                        for competitor_url, name in competitor_names.items()}
+
+    # Format mentions for display
+    for competitor_url, name in competitor_names.items():
+        competitor_mentions = all_mentions[competitor_url]
+        formatted_mentions = []
+        if competitor_mentions:
+            formatted_mentions.append(
+                f"Found {len(competitor_mentions)} mention(s) of {name} on the {company_url} website")
+            for mention in competitor_mentions:
+                formatted_mentions.append(f"Context: {mention['context']}")
+        else:
+            formatted_mentions.append(
+                f"No mentions of {name} found on the {company_url} website")
+
+        analysis_results["competitors"][competitor_url]["mentions"] = formatted_mentions
 
     return analysis_results
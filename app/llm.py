@@ -1,16 +1,145 @@
-from openai import OpenAI
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Optional, List
+import httpx
+import tiktoken
+from json_repair import repair_json
+from openai import OpenAI, DefaultHttpxClient
 from utils import load_api_key
-import json
+import orjson
 
-client = OpenAI(api_key=load_api_key())
+MODEL = "gpt-4-turbo-preview"
+# Structured outputs (json_schema response format) need a gpt-4o snapshot
+COMPETITOR_MODEL = "gpt-4o-2024-08-06"
 
+# Token budgets for the scraped content included in the prompt
+COMPANY_CONTENT_TOKENS = 750
+PRESS_CONTENT_TOKENS = 250
+COMPETITOR_CONTENT_TOKENS = 300
 
-def generate_insights(data: dict) -> dict:
-    """Generate insights using GPT-4 based on input data with specific output requirements."""
+# Minimum number of new characters streamed before partial insights are re-parsed
+STREAM_UPDATE_CHARS = 200
+
+# Schema for the batched competitor analysis, one entry per competitor in input order
+COMPETITOR_INSIGHTS_SCHEMA = {
+    "name": "competitor_insights",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "competitors": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "summary": {"type": "string"},
+                        "positioning": {"type": "string"},
+                        "talking_points": {"type": "string"}
+                    },
+                    "required": ["name", "summary", "positioning", "talking_points"],
+                    "additionalProperties": False
+                }
+            }
+        },
+        "required": ["competitors"],
+        "additionalProperties": False
+    }
+}
+
+# Generated insights keyed by a hash of the prompt, so identical requests skip the API call
+INSIGHTS_CACHE_SIZE = 32
+_insights_cache: "OrderedDict[str, dict]" = OrderedDict()
+_insights_cache_lock = threading.Lock()
+
+
+def create_openai_client() -> OpenAI:
+    """Create an OpenAI client on an HTTP/2 keep-alive connection pool."""
+    return OpenAI(
+        api_key=load_api_key(),
+        http_client=DefaultHttpxClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=10),
+            # Fail fast on connect, but leave reads long enough for a full non-streamed
+            # completion (up to 2000 tokens), which sends nothing until it is done
+            timeout=httpx.Timeout(300.0, connect=5.0)
+        )
+    )
+
+
+@lru_cache(maxsize=1)
+def get_client() -> OpenAI:
+    """Return the shared OpenAI client, creating it on first use."""
+    return create_openai_client()
+
+
+# Tokenizer for the insights model, loaded on first successful use
+_encoding: Optional[tiktoken.Encoding] = None
+
+
+def get_encoding() -> Optional[tiktoken.Encoding]:
+    """Load the tokenizer for the insights model once.
+
+    Loading can download the BPE file, so a failure is not remembered and the
+    next call tries again."""
+    global _encoding
+    if _encoding is None:
+        try:
+            _encoding = tiktoken.encoding_for_model(MODEL)
+        except Exception as e:
+            print(f"Error loading tokenizer for {MODEL}: {str(e)}")
+    return _encoding
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Truncate text to at most max_tokens tokens of the model's tokenizer."""
+    # Tokens rarely exceed 8 characters, so there is no need to encode text past that
+    text = text[:max_tokens * 8]
+    encoding = get_encoding()
+    if encoding is None:
+        # Roughly 4 characters per token for English text
+        return text[:max_tokens * 4]
+
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+def get_cached_insights(cache_key: str) -> Optional[dict]:
+    """Return a copy of cached insights for the given key, or None on a cache miss."""
+    with _insights_cache_lock:
+        insights = _insights_cache.get(cache_key)
+        if insights is None:
+            return None
+        _insights_cache.move_to_end(cache_key)
+        return dict(insights)
+
+
+def cache_insights(cache_key: str, insights: dict) -> None:
+    """Store insights in the cache, evicting the least recently used entry when full."""
+    with _insights_cache_lock:
+        _insights_cache[cache_key] = dict(insights)
+        _insights_cache.move_to_end(cache_key)
+        if len(_insights_cache) > INSIGHTS_CACHE_SIZE:
+            _insights_cache.popitem(last=False)
+
+
+def generate_insights(data: dict, client: Optional[OpenAI] = None,
+                      on_update: Optional[Callable[[dict], None]] = None) -> dict:
+    """Generate insights using GPT-4 based on input data with specific output requirements.
+
+    If on_update is given, the response is streamed and on_update is called with the
+    partially parsed insights as they arrive.
+    """
     # Extract company data for better context
     company_url = data.get('company_data', {}).get('url', 'Unknown')
-    company_content = data.get('company_data', {}).get('content', '')
-    press_content = data.get('company_data', {}).get('press_content', '')
+    company_content = truncate_tokens(
+        data.get('company_data', {}).get('content', ''), COMPANY_CONTENT_TOKENS)
+    press_content = truncate_tokens(
+        data.get('company_data', {}).get('press_content', ''), PRESS_CONTENT_TOKENS)
 
     # Format prompt with clear sections matching the exact output requirements
     prompt = f"""
@@ -23,10 +152,10 @@ def generate_insights(data: dict) -> dict:
     - Value proposition: {data.get('value_proposition', 'N/A')}
     
     ### TARGET COMPANY DATA
-    {company_content[:3000]}
+    {company_content}
     
     ### PRESS/NEWS CONTENT
-    {press_content[:1000]}
+    {press_content}
     
     ### TASK
     Create a detailed sales intelligence one-pager with the following SPECIFIC sections exactly as described:
@@ -58,106 +187,86 @@ def generate_insights(data: dict) -> dict:
     Make each section detailed, specific, and actionable for the sales rep. If you cannot find certain information, explain what is missing and provide your best educated guess based on the company's industry and size.
     """
 
+    # The prompt contains every input sent to the model, so it doubles as the cache key
+    cache_key = hashlib.blake2b(prompt.encode()).hexdigest()
+    cached = get_cached_insights(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
+        response = (client or get_client()).chat.completions.create(
+            model=MODEL,
             messages=[
                 {"role": "system", "content": "You are a sales intelligence agent specialized in helping sales representatives prepare for meetings with potential clients. You extract specific insights from company websites, press releases, job postings, and public documents to help sales reps understand their prospects. Focus on providing factual, accurate information that follows the exact output requirements."},
                 {"role": "user", "content": prompt}
             ],
             response_format={"type": "json_object"},
             temperature=0.3,  # Lower temperature for more focused, factual responses
-            max_tokens=2000   # Ensure we get a substantial response
+            max_tokens=2000,  # Ensure we get a substantial response
+            stream=on_update is not None
         )
 
+        if on_update is not None:
+            raw_content = stream_response(response, on_update)
+        else:
+            raw_content = response.choices[0].message.content
+
         # Parse the response
-        raw_content = response.choices[0].message.content
         try:
-            insights = json.loads(raw_content)
-
-            # Ensure all required keys exist
-            required_keys = ["company_strategy", "leadership_information",
-                             "product_strategy_summary", "article_links"]
-            for key in required_keys:
-                if key not in insights:
-                    insights[key] = "Information not found in company data."
-
-            # Post-process article links to ensure it's properly formatted if it's still a dictionary
-            if isinstance(insights["article_links"], dict):
-                formatted_links = "### Article Sources:\n\n"
-
-                if "company_strategy" in insights["article_links"]:
-                    formatted_links += "**Company Strategy Sources:**\n"
-                    sources = insights["article_links"]["company_strategy"]
-                    if isinstance(sources, list):
-                        for source in sources:
-                            formatted_links += f"- {source}\n"
-                    else:
-                        formatted_links += f"- {sources}\n"
-
-                if "leadership" in insights["article_links"]:
-                    formatted_links += "\n**Leadership Sources:**\n"
-                    sources = insights["article_links"]["leadership"]
-                    if isinstance(sources, list):
-                        for source in sources:
-                            formatted_links += f"- {source}\n"
-                    else:
-                        formatted_links += f"- {sources}\n"
-
-                if "technology" in insights["article_links"]:
-                    formatted_links += "\n**Technology & Strategy Sources:**\n"
-                    sources = insights["article_links"]["technology"]
-                    if isinstance(sources, list):
-                        for source in sources:
-                            formatted_links += f"- {source}\n"
-                    else:
-                        formatted_links += f"- {sources}\n"
-
-                insights["article_links"] = formatted_links
-
-            # Add raw response for debugging
-            insights["raw_response"] = raw_content
-
-            return insights
-
-        except json.JSONDecodeError:
-            # If JSON parsing fails, create our own structured response
-            print(f"JSON parsing failed. Raw content: {raw_content[:200]}...")
-
-            # Try to extract sections manually using string markers
-            sections = {}
-            current_section = None
-            lines = raw_content.split('\n')
-
-            for line in lines:
-                line = line.strip()
-                if "COMPANY STRATEGY" in line.upper() or "company_strategy" in line:
-                    current_section = "company_strategy"
-                    sections[current_section] = ""
-                elif "LEADERSHIP INFORMATION" in line.upper() or "leadership_information" in line:
-                    current_section = "leadership_information"
-                    sections[current_section] = ""
-                elif "PRODUCT/STRATEGY SUMMARY" in line.upper() or "product_strategy_summary" in line:
-                    current_section = "product_strategy_summary"
-                    sections[current_section] = ""
-                elif "ARTICLE LINKS" in line.upper() or "article_links" in line:
-                    current_section = "article_links"
-                    sections[current_section] = ""
-                elif current_section and line:
-                    # Remove common JSON formatting characters
-                    clean_line = line.replace('"', '').replace(
-                        ',', '').replace('{', '').replace('}', '')
-                    sections[current_section] += clean_line + "\n"
-
-            # Ensure all required keys exist
-            for key in required_keys:
-                if key not in sections or not sections[key].strip():
-                    sections[key] = "Information not found in company data."
-
-            # Add raw response for debugging
-            sections["raw_response"] = raw_content
-
-            return sections
+            insights = orjson.loads(raw_content)
+        except orjson.JSONDecodeError:
+            # Repair common LLM JSON mistakes (code fences, trailing commas, truncation)
+            print(f"JSON parsing failed, repairing. Raw content: {raw_content[:200]}...")
+            insights = repair_json(raw_content, return_objects=True)
+
+        if not isinstance(insights, dict):
+            insights = {}
+
+        # Ensure all required keys exist
+        required_keys = ["company_strategy", "leadership_information",
+                         "product_strategy_summary", "article_links"]
+        for key in required_keys:
+            if not insights.get(key):
+                insights[key] = "Information not found in company data."
+
+        # Post-process article links to ensure it's properly formatted if it's still a dictionary
+        if isinstance(insights["article_links"], dict):
+            formatted_links = "### Article Sources:\n\n"
+
+            if "company_strategy" in insights["article_links"]:
+                formatted_links += "**Company Strategy Sources:**\n"
+                sources = insights["article_links"]["company_strategy"]
+                if isinstance(sources, list):
+                    for source in sources:
+                        formatted_links += f"- {source}\n"
+                else:
+                    formatted_links += f"- {sources}\n"
+
+            if "leadership" in insights["article_links"]:
+                formatted_links += "\n**Leadership Sources:**\n"
+                sources = insights["article_links"]["leadership"]
+                if isinstance(sources, list):
+                    for source in sources:
+                        formatted_links += f"- {source}\n"
+                else:
+                    formatted_links += f"- {sources}\n"
+
+            if "technology" in insights["article_links"]:
+                formatted_links += "\n**Technology & Strategy Sources:**\n"
+                sources = insights["article_links"]["technology"]
+                if isinstance(sources, list):
+                    for source in sources:
+                        formatted_links += f"- {source}\n"
+                else:
+                    formatted_links += f"- {sources}\n"
+
+            insights["article_links"] = formatted_links
+
+        # Add raw response for debugging
+        insights["raw_response"] = raw_content
+
+        cache_insights(cache_key, insights)
+        return insights
 
     except Exception as e:
         print(f"Error in generate_insights: {str(e)}")
@@ -168,3 +277,95 @@ def generate_insights(data: dict) -> dict:
             "article_links": "Error generating article links.",
             "raw_response": f"Exception occurred: {str(e)}"
         }
+
+
+def stream_response(response, on_update: Callable[[dict], None]) -> str:
+    """Collect a streamed completion, passing partially parsed JSON to on_update along the way."""
+    chunks = []
+    streamed_chars = 0
+    last_update_chars = 0
+    for chunk in response:
+        if not chunk.choices or not chunk.choices[0].delta.content:
+            continue
+        chunks.append(chunk.choices[0].delta.content)
+        streamed_chars += len(chunks[-1])
+
+        # Re-parsing the whole response on every token would be quadratic, so throttle updates
+        if streamed_chars - last_update_chars >= STREAM_UPDATE_CHARS:
+            last_update_chars = streamed_chars
+            partial = repair_json("".join(chunks), return_objects=True)
+            if isinstance(partial, dict):
+                on_update(partial)
+
+    return "".join(chunks)
+
+
+def generate_competitor_insights(data_list: List[dict], product_name: str = "our product",
+                                 client: Optional[OpenAI] = None) -> List[dict]:
+    """Generate insights for several competitors in a single GPT-4o call using structured outputs."""
+    if not data_list:
+        return []
+
+    # Pack every competitor into one prompt so the instructions are only sent once
+    competitor_blocks = []
+    for i, competitor in enumerate(data_list, start=1):
+        competitor_text = truncate_tokens(
+            f"Description: {competitor.get('description', '')}\n"
+            f"Key Features: {competitor.get('main_features', '')}\n"
+            f"Key Differentiators: {competitor.get('differentiators', '')}\n"
+            f"Mentions on target website: {' '.join(competitor.get('mentions', []))}",
+            COMPETITOR_CONTENT_TOKENS)
+        competitor_blocks.append(
+            f"### COMPETITOR {i}: {competitor.get('name', 'Unknown')} ({competitor.get('url', '')})\n{competitor_text}")
+    competitors_text = "\n\n".join(competitor_blocks)
+
+    prompt = f"""
+    You are helping a sales representative position {product_name} against the competitors below.
+
+    {competitors_text}
+
+    ### TASK
+    For EACH competitor, in the same order as listed, provide:
+    - "name": the competitor name
+    - "summary": a short summary of what the competitor offers
+    - "positioning": how {product_name} compares and where it wins
+    - "talking_points": markdown bullet points the sales rep can use in the meeting
+    """
+
+    try:
+        response = (client or get_client()).chat.completions.create(
+            model=COMPETITOR_MODEL,
+            messages=[
+                {"role": "system", "content": "You are a sales intelligence agent specialized in competitive analysis. Focus on providing factual, accurate information based on the provided competitor data."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_schema",
+                             "json_schema": COMPETITOR_INSIGHTS_SCHEMA},
+            temperature=0.3
+        )
+
+        competitors = orjson.loads(
+            response.choices[0].message.content).get("competitors", [])
+
+        # Keep one result per input competitor even if the model returned fewer
+        results = []
+        for i, competitor in enumerate(data_list):
+            if i < len(competitors) and isinstance(competitors[i], dict):
+                results.append(competitors[i])
+            else:
+                results.append({
+                    "name": competitor.get("name", "Unknown"),
+                    "summary": "Information not found in competitor data.",
+                    "positioning": "Information not found in competitor data.",
+                    "talking_points": "Information not found in competitor data."
+                })
+        return results
+
+    except Exception as e:
+        print(f"Error in generate_competitor_insights: {str(e)}")
+        return [{
+            "name": competitor.get("name", "Unknown"),
+            "summary": f"Error generating competitor insights: {str(e)}",
+            "positioning": "Error generating competitor positioning.",
+            "talking_points": "Error generating talking points."
+        } for competitor in data_list]
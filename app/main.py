@@ -1,13 +1,16 @@
 import streamlit as st
-from dotenv import load_dotenv
+import hashlib
+import io
 import os
 import json
-from utils import parse_pdf, scrape_company_data
-from llm import generate_insights
-from fetch_data import get_competitor_mentions
+import pickle
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
-# Load environment variables
-load_dotenv()
+# The app modules pull in heavy dependencies (OpenAI SDK, PyMuPDF, sentence-transformers),
+# so they are imported where first used to keep the initial page render fast
 
 # Page configuration - Must be the first Streamlit command
 st.set_page_config(
@@ -16,13 +19,150 @@ st.set_page_config(
     layout="wide"
 )
 
+# Matches the summary line get_competitor_mentions puts first in each mentions list
+RE_MENTION_SUMMARY = re.compile(r'Found|No mentions')
 
+# Markdown block rendered for each competitor
+COMPETITOR_TEMPLATE = """
+### {name} {mention_summary}
+
+**Website:** {url}
+
+**Description:**
+{description}
+
+**Key Features:**
+{main_features}
+"""
+
+
+@st.cache_resource(show_spinner=False)
+def load_env() -> bool:
+    """Load environment variables from .env once per process instead of on every rerun."""
+    from dotenv import load_dotenv
+    return load_dotenv()
+
+
+def fast_hash(value) -> bytes:
+    """Hash a picklable value for st.cache_data; much faster than Streamlit's default dict hashing."""
+    return hashlib.blake2b(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), digest_size=16).digest()
+
+
+def add_scheme(url: str) -> str:
+    """Prefix a URL with https:// if it has no scheme, as get_competitor_mentions does."""
+    return url if url.startswith(('http://', 'https://')) else 'https://' + url
+
+
+def normalize_competitor_url(url: str) -> str:
+    """Normalize a competitor URL for duplicate detection and cache keys."""
+    return add_scheme(url).rstrip('/').lower()
+
+
+def parse_competitors(competitors: str) -> dict:
+    """Map each normalized competitor URL to the URL as first entered, in input order.
+
+    The normalized URLs only identify duplicates and form the cache key; the original
+    URLs are the ones fetched and displayed, since paths can be case-sensitive."""
+    urls = {}
+    for url in competitors.split(","):
+        url = url.strip()
+        if url:
+            urls.setdefault(normalize_competitor_url(url), url)
+    return urls
+
+
+def order_competitor_mentions(mentions: dict, competitor_urls: list) -> dict:
+    """Return mentions with the competitors in the given order, keyed by those URLs.
+
+    A cached result comes from the first run with the same competitor set, whose
+    order and URL spelling can differ from the current input."""
+    by_key = {normalize_competitor_url(url): data
+              for url, data in mentions.get("competitors", {}).items()}
+    ordered = {}
+    for url in competitor_urls:
+        data = by_key.get(normalize_competitor_url(url))
+        if data is not None:
+            ordered[add_scheme(url)] = data
+    return {**mentions, "competitors": ordered}
+
+
+def with_script_run_ctx(func):
+    """Wrap func to run with the current script's context when submitted to a worker thread.
+
+    Streamlit calls, including the st.cache_data lookups, need that context; pool threads
+    don't inherit it from the thread that submits the work."""
+    ctx = get_script_run_ctx()
+
+    def run(*args):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return func(*args)
+    return run
+
+
+class ScrapeFailed(Exception):
+    """Raised from a cached wrapper so st.cache_data doesn't keep a failed result.
+
+    The failed result is still available as `result` for the current run."""
+
+    def __init__(self, result):
+        super().__init__("scrape failed")
+        self.result = result
+
+
+def result_or_failed(future):
+    """Return a cached wrapper's result, or the failed result it refused to cache."""
+    try:
+        return future.result(), False
+    except ScrapeFailed as e:
+        return e.result, True
+
+
+@st.cache_data(ttl=3600, max_entries=128, show_spinner=False)
+def cached_scrape_company_data(company_url: str) -> dict:
+    """Scrape company data, reusing results for the same URL for an hour."""
+    from utils import scrape_company_data
+    company_data = scrape_company_data(company_url)
+    # Don't serve a temporary network failure for an hour
+    if company_data.get("content", "").startswith("Could not access"):
+        raise ScrapeFailed(company_data)
+    return company_data
+
+
+@st.cache_data(ttl=1800, max_entries=64, show_spinner=False)
+def cached_get_competitor_mentions(company_url: str, competitors_key: tuple, _competitor_urls: list) -> dict:
+    """Analyze competitors, reusing results for the same company and competitor set for 30 minutes.
+
+    Only competitors_key is hashed; _competitor_urls are the original URLs to analyze."""
+    from fetch_data import get_competitor_mentions
+    mentions = get_competitor_mentions(company_url, _competitor_urls)
+    # Don't serve a competitor that failed to load for 30 minutes
+    if any(data.get("name") in ("Could not access website", "Error")
+           for data in mentions.get("competitors", {}).values()):
+        raise ScrapeFailed(mentions)
+    return mentions
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def cached_parse_pdf(pdf_bytes: bytes) -> str:
+    """Parse an uploaded PDF, reusing the result when the same file is submitted again."""
+    from utils import parse_pdf
+    return parse_pdf(io.BytesIO(pdf_bytes))
+
+
+@st.cache_resource(show_spinner=False)
+def get_openai_client():
+    """Create the OpenAI client once and share its connection pool across reruns and sessions."""
+    from llm import create_openai_client
+    return create_openai_client()
+
+
+@st.cache_data(max_entries=32, show_spinner=False, hash_funcs={dict: fast_hash})
 def format_competitor_mentions(mentions: dict) -> str:
     """Format competitor mentions for display with error handling."""
     if not mentions or not isinstance(mentions, dict) or "competitors" not in mentions:
         return "No competitor information available."
 
-    formatted_text = ""
+    parts = []
 
     for competitor_url, data in mentions.get("competitors", {}).items():
         if not isinstance(data, dict):
@@ -39,50 +179,42 @@ def format_competitor_mentions(mentions: dict) -> str:
         mention_summary = ""
         if competitor_mentions and len(competitor_mentions) > 0:
             first_mention = competitor_mentions[0]
-            if "Found" in first_mention:
-                mention_summary = f"**{first_mention}**"
-            elif "No mentions" in first_mention:
+            if RE_MENTION_SUMMARY.search(first_mention):
                 mention_summary = f"**{first_mention}**"
 
         # Format the competitor information with better styling
-        formatted_text += f"""
-### {name} {mention_summary}
-
-**Website:** {competitor_url}
-
-**Description:**
-{description}
-
-**Key Features:**
-{main_features}
-"""
+        parts.append(COMPETITOR_TEMPLATE.format_map({
+            "name": name,
+            "mention_summary": mention_summary,
+            "url": competitor_url,
+            "description": description,
+            "main_features": main_features
+        }))
 
         # Add differentiators if available
         if differentiators:
-            formatted_text += f"""
+            parts.append(f"""
 **Key Differentiators:**
 {differentiators}
-"""
+""")
 
         # Add detailed mention contexts if available
         if competitor_mentions and len(competitor_mentions) > 1:
-            formatted_text += "\n**Mention Details:**\n"
+            parts.append("\n**Mention Details:**\n")
             for i, mention in enumerate(competitor_mentions):
                 if i > 0:  # Skip the first item which is the summary
                     if mention.startswith("Context:"):
                         # Format context with indentation and italics
-                        formatted_text += f"- *{mention}*\n"
+                        parts.append(f"- *{mention}*\n")
                     else:
-                        formatted_text += f"- {mention}\n"
+                        parts.append(f"- {mention}\n")
 
-        formatted_text += "\n---\n"
+        parts.append("\n---\n")
 
-    if not formatted_text:
-        return "No competitor information available."
-
-    return formatted_text
+    return "".join(parts) or "No competitor information available."
 
 
+@st.cache_data(max_entries=32, show_spinner=False, hash_funcs={dict: fast_hash})
 def format_article_links(article_links_data):
     """Format article links section properly regardless of format."""
     if not article_links_data:
@@ -94,37 +226,27 @@ def format_article_links(article_links_data):
 
     # Handle dictionary format
     if isinstance(article_links_data, dict):
-        formatted_text = ""
-
-        # Format search queries
+        # Search queries and resources come first, followed by any other keys
+        headings = []
         if 'search_queries' in article_links_data:
-            formatted_text += "### Recommended Search Queries:\n\n"
-            if isinstance(article_links_data['search_queries'], list):
-                for query in article_links_data['search_queries']:
-                    formatted_text += f"- {query}\n"
-            else:
-                formatted_text += article_links_data['search_queries'] + "\n\n"
-
-        # Format resources
+            headings.append(("search_queries", "### Recommended Search Queries:\n\n"))
         if 'resources' in article_links_data:
-            formatted_text += "\n### Recommended Resources:\n\n"
-            if isinstance(article_links_data['resources'], list):
-                for resource in article_links_data['resources']:
-                    formatted_text += f"- {resource}\n"
-            else:
-                formatted_text += article_links_data['resources'] + "\n\n"
-
-        # If there are other keys in the dictionary
-        for key, value in article_links_data.items():
+            headings.append(("resources", "\n### Recommended Resources:\n\n"))
+        for key in article_links_data:
             if key not in ['search_queries', 'resources']:
-                formatted_text += f"\n### {key.replace('_', ' ').title()}:\n\n"
-                if isinstance(value, list):
-                    for item in value:
-                        formatted_text += f"- {item}\n"
-                else:
-                    formatted_text += value + "\n\n"
+                headings.append((key, f"\n### {key.replace('_', ' ').title()}:\n\n"))
+
+        parts = []
+        for key, heading in headings:
+            value = article_links_data[key]
+            parts.append(heading)
+            if isinstance(value, list):
+                for item in value:
+                    parts.append(f"- {item}\n")
+            else:
+                parts.append(f"{value}\n\n")
 
-        return formatted_text
+        return "".join(parts)
 
     # Handle unexpected format
     return str(article_links_data)
@@ -135,15 +257,15 @@ def display_debug_info(data):
     with st.expander("Debug Information (Click to expand)"):
         st.write("### Company Data Preview")
         if isinstance(data, dict) and "company_data" in data and isinstance(data["company_data"], dict):
-            if "content" in data["company_data"]:
+            if "content_preview" in data["company_data"]:
                 st.text_area("Company Content Sample",
-                             data["company_data"]["content"][:1000] + "...",
+                             data["company_data"]["content_preview"] + "...",
                              height=200)
 
-            if "press_content" in data["company_data"]:
+            if "press_preview" in data["company_data"]:
                 st.text_area("Press Content Sample",
-                             data["company_data"]["press_content"][:1000] +
-                             "..." if data["company_data"]["press_content"] else "No press content found",
+                             data["company_data"]["press_preview"] +
+                             "..." if data["company_data"]["press_preview"] else "No press content found",
                              height=100)
 
         st.write("### Raw LLM Response")
@@ -151,7 +273,29 @@ def display_debug_info(data):
             st.text_area("Raw LLM Response", data["raw_response"], height=200)
 
 
+def render_streaming_preview(placeholder, partial_insights: dict) -> None:
+    """Render the sections generated so far while the LLM response is still streaming."""
+    sections = [
+        ("### 📊 Company Strategy", partial_insights.get("company_strategy")),
+        ("### 👥 Leadership Information", partial_insights.get("leadership_information")),
+        ("### 🚀 Product/Strategy Summary", partial_insights.get("product_strategy_summary")),
+    ]
+    placeholder.markdown("\n\n".join(
+        f"{header}\n\n{body}" for header, body in sections if isinstance(body, str) and body))
+
+
+@st.fragment
+def debug_fragment(insights, company_data):
+    """Show the debug toggle; toggling it only reruns this fragment, not the pipeline."""
+    debug_mode = st.checkbox("Enable Debug Mode", key="debug_mode")
+    if debug_mode and isinstance(insights, dict):
+        insights_with_data = insights.copy()
+        insights_with_data["company_data"] = company_data
+        display_debug_info(insights_with_data)
+
+
 def main():
+    load_env()
     st.title("🤖 Sales Assistant Agent")
 
     # Input section
@@ -168,9 +312,6 @@ def main():
     target_customer = st.sidebar.text_area(
         "Target Customer", "Alex Balazs")
 
-    # Debug mode checkbox
-    debug_mode = st.sidebar.checkbox("Enable Debug Mode")
-
     uploaded_file = st.sidebar.file_uploader(
         "Upload Product Overview Sheet", type="pdf")
 
@@ -179,88 +320,107 @@ def main():
             st.error("Please provide a company URL to analyze.")
             return
 
+        from llm import generate_insights
+
         with st.spinner("Generating insights..."):
             try:
-                # Process inputs
-                competitor_list = [url.strip()
-                                   for url in competitors.split(",") if url.strip()]
-
-                # Scrape company data
-                st.info("Scraping company data...")
-                company_data = scrape_company_data(company_url)
-
-                # Get competitor mentions and generate embeddings
-                if competitor_list:
-                    st.info("Analyzing competitors and checking for mentions...")
-                    mentions = get_competitor_mentions(
-                        company_url, competitor_list)
+                # Normalized so reordered, duplicated or differently formatted URLs share cache entries
+                competitor_urls = parse_competitors(competitors)
+                competitors_key = tuple(sorted(competitor_urls))
+                competitor_list = list(competitor_urls.values())
+                pdf_bytes = uploaded_file.getvalue() if uploaded_file else None
+
+                # Reuse the previous results when none of the pipeline inputs changed
+                input_signature = hashlib.blake2b(json.dumps([
+                    product_name, company_url, product_category, competitor_list,
+                    value_proposition, target_customer,
+                    # The upload is identified by its bytes, as another file can share its name and size
+                    hashlib.blake2b(pdf_bytes).hexdigest() if pdf_bytes is not None else None
+                ]).encode()).hexdigest()
+
+                if st.session_state.get("last_signature") == input_signature:
+                    insights, mentions, company_data = st.session_state["last_result"]
                 else:
-                    mentions = {"competitors": {}}
-
-                # Parse PDF if uploaded
-                pdf_content = ""
-                if uploaded_file:
-                    st.info("Parsing product overview...")
-                    pdf_content = parse_pdf(uploaded_file)
-
-                # Generate insights with all available data
-                st.info("Generating comprehensive insights...")
-                insights = generate_insights({
-                    "product_name": product_name,
-                    "company_data": company_data,
-                    "product_category": product_category,
-                    "value_proposition": value_proposition,
-                    "target_customer": target_customer,
-                    "pdf_content": pdf_content,
-                    "competitor_info": mentions
-                })
+                    # Scrape company data, check competitor mentions and parse the PDF
+                    # concurrently, since none of them depends on the others
+                    with ThreadPoolExecutor(max_workers=3) as executor:
+                        st.info("Scraping company data...")
+                        company_future = executor.submit(
+                            with_script_run_ctx(cached_scrape_company_data), company_url)
+
+                        mentions_future = None
+                        if competitors_key:
+                            st.info("Analyzing competitors and checking for mentions...")
+                            mentions_future = executor.submit(
+                                with_script_run_ctx(cached_get_competitor_mentions), company_url, competitors_key, competitor_list)
+
+                        pdf_future = None
+                        if pdf_bytes is not None:
+                            st.info("Parsing product overview...")
+                            pdf_future = executor.submit(
+                                with_script_run_ctx(cached_parse_pdf), pdf_bytes)
+
+                        company_data, scrape_failed = result_or_failed(company_future)
+                        mentions, mentions_failed = result_or_failed(mentions_future) if mentions_future else (
+                            {"competitors": {}}, False)
+                        mentions = order_competitor_mentions(mentions, competitor_list)
+                        pdf_content = pdf_future.result() if pdf_future else ""
+
+                    # Generate insights with all available data, previewing sections as they stream in
+                    st.info("Generating comprehensive insights...")
+                    preview = st.empty()
+                    insights = generate_insights({
+                        "product_name": product_name,
+                        "company_data": company_data,
+                        "product_category": product_category,
+                        "value_proposition": value_proposition,
+                        "target_customer": target_customer,
+                        "pdf_content": pdf_content,
+                        "competitor_info": mentions
+                    }, client=get_openai_client(),
+                        on_update=lambda partial: render_streaming_preview(preview, partial))
+                    preview.empty()
+
+                    # Keep successful results only, so a failed run can be retried
+                    if not scrape_failed and not mentions_failed and not str(insights.get("raw_response", "")).startswith("Exception occurred"):
+                        st.session_state["last_signature"] = input_signature
+                        st.session_state["last_result"] = (
+                            insights, mentions, company_data)
 
                 # Display outputs in a clean format
                 st.title("Sales Intelligence One-Pager")
 
                 # Display debug information if enabled
-                if debug_mode and isinstance(insights, dict):
-                    insights_with_data = insights.copy()
-                    insights_with_data["company_data"] = company_data
-                    display_debug_info(insights_with_data)
+                debug_fragment(insights, company_data)
 
                 # Display sections IN THE EXACT ORDER specified in requirements
+                get_insight = (insights if isinstance(insights, dict) else {}).get
 
+                # Each section is sent as a single markdown element (header, body and rule)
                 # 1. Company Strategy (FIRST)
-                st.markdown("### 📊 Company Strategy")
-                if isinstance(insights, dict):
-                    st.markdown(insights.get("company_strategy",
-                                "No company strategy information available."))
-                st.markdown("---")
+                company_strategy = get_insight(
+                    "company_strategy", "No company strategy information available.")
+                st.markdown(f"### 📊 Company Strategy\n\n{company_strategy}\n\n---")
 
                 # 2. Competitor Mentions (SECOND)
-                st.markdown("### 🥊 Competitor Mentions")
                 formatted_mentions = format_competitor_mentions(mentions)
-                st.markdown(formatted_mentions)
-                st.markdown("---")
+                st.markdown(f"### 🥊 Competitor Mentions\n\n{formatted_mentions}\n\n---")
 
                 # 3. Leadership Information (THIRD)
-                st.markdown("### 👥 Leadership Information")
-                if isinstance(insights, dict):
-                    st.markdown(insights.get("leadership_information",
-                                "No leadership information available."))
-                st.markdown("---")
+                leadership_information = get_insight(
+                    "leadership_information", "No leadership information available.")
+                st.markdown(f"### 👥 Leadership Information\n\n{leadership_information}\n\n---")
 
                 # 4. Product/Strategy Summary (FOURTH)
-                st.markdown("### 🚀 Product/Strategy Summary")
-                if isinstance(insights, dict):
-                    st.markdown(insights.get("product_strategy_summary",
-                                "No product strategy information available."))
-                st.markdown("---")
+                product_strategy_summary = get_insight(
+                    "product_strategy_summary", "No product strategy information available.")
+                st.markdown(f"### 🚀 Product/Strategy Summary\n\n{product_strategy_summary}\n\n---")
 
                 # 5. Article Links (FIFTH/LAST)
-                st.markdown("### 🔗 Article Links")
-                if isinstance(insights, dict):
-                    article_links = insights.get(
-                        "article_links", "No article links available.")
-                    formatted_article_links = format_article_links(
-                        article_links)
-                    st.markdown(formatted_article_links)
+                article_links = get_insight(
+                    "article_links", "No article links available.")
+                formatted_article_links = format_article_links(article_links)
+                st.markdown(f"### 🔗 Article Links\n\n{formatted_article_links}")
 
             except Exception as e:
                 st.error(f"An error occurred: {str(e)}")
@@ -272,6 +432,7 @@ def main():
 
 
 if __name__ == "__main__":
+    load_env()
     if not os.getenv("OPENAI_API_KEY"):
         st.error("Please set up your OpenAI API key in the .env file!")
     else:
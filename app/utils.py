@@ -1,13 +1,96 @@
-import PyPDF2
+import fitz
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 import os
 import re
-import time
-from typing import List, Dict, Optional, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Optional, Any, Tuple
+from urllib.parse import urlparse, urlsplit
 from dotenv import load_dotenv
 from sentence_transformers import SentenceTransformer
 
+# Prefer the C-backed lxml parser, falling back to the stdlib parser if unavailable
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Maximum number of concurrent requests sent to the same host
+MAX_REQUESTS_PER_HOST = 2
+_host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_host_semaphores_lock = threading.Lock()
+
+# Standard headers to mimic a browser request
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# Shared session so connections (and TLS handshakes) are reused across requests
+SESSION = requests.Session()
+SESSION.headers.update(REQUEST_HEADERS)
+_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64,
+                       max_retries=Retry(total=2, backoff_factor=0.3))
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+
+# Largest response body read into memory; bigger pages are skipped or truncated
+MAX_RESPONSE_BYTES = 5_000_000
+
+# Maximum number of candidate pages fetched at once
+MAX_FETCH_WORKERS = 8
+
+# Maximum number of companies scraped at once by scrape_many
+MAX_COMPANY_WORKERS = 4
+
+# Length of the content previews shown in the debug view
+DEBUG_PREVIEW_CHARS = 1000
+
+# Length of the main content kept from a scraped page
+MAX_MAIN_CONTENT_CHARS = 3000
+
+# Section markers written by format_sections, matched at the start of a line
+RE_SECTION_MARKER = re.compile(
+    r'^(COMPANY NAME|COMPANY DESCRIPTION|MAIN HEADINGS|ABOUT/MISSION|LEADERSHIP INFORMATION|'
+    r'JOB POSTINGS \(TECH STACK INDICATORS\)|FINANCIAL INFORMATION|MAIN CONTENT):', re.M)
+
+# Embedded sections and the content marker each one is read from (press comes from press_content)
+SECTION_MARKERS = {
+    "company_description": "COMPANY DESCRIPTION",
+    "about": "ABOUT/MISSION",
+    "leadership": "LEADERSHIP INFORMATION",
+    "jobs": "JOB POSTINGS (TECH STACK INDICATORS)",
+    "financial": "FINANCIAL INFORMATION",
+    "main_content": "MAIN CONTENT"
+}
+
+# Precompiled class/id patterns used by the extractors below
+RE_PROFILE_CLASS = re.compile(r'(profile|card|member|team-member|executive)', re.I)
+RE_ROLE_CLASS = re.compile(r'(title|role|position)', re.I)
+RE_TEAM_SECTION = re.compile(r'(team|leadership|management|executives)', re.I)
+RE_JOB_LISTING = re.compile(r'(job|position|opening|vacancy)', re.I)
+RE_JOB_DESCRIPTION_CLASS = re.compile(r'(description|summary)', re.I)
+RE_FINANCIAL_SECTION = re.compile(r'(financial|earnings|results|performance)', re.I)
+RE_MAIN_CONTENT_CLASSES = [re.compile(class_name, re.I) for class_name in
+                           ['content', 'main', 'body', 'container', 'wrapper']]
+RE_ABOUT_SECTION = re.compile(r'(about|mission|vision|values)', re.I)
+RE_ARTICLE_CLASS = re.compile(r'(news|press|article|post|release)', re.I)
+RE_DATE_CLASS = re.compile(r'(date|time|published)', re.I)
+RE_SUMMARY_CLASS = re.compile(r'(summary|excerpt|description)', re.I)
+# Keywords marking links to leadership, press and financial report pages; case-insensitive,
+# so link text and hrefs are matched without lowercasing each one
+RE_LEADERSHIP_LINK = re.compile(r'leadership|team|management|executives|board|directors|founders', re.I)
+RE_PRESS_LINK = re.compile(r'news|press|blog|media|announcement', re.I)
+RE_FINANCIAL_LINK = re.compile(r'annual report|10-k|10k|financial report|earnings', re.I)
+
 
 def load_api_key() -> Optional[str]:
     """Load and validate OpenAI API key from environment variables."""
@@ -21,58 +104,128 @@ def load_api_key() -> Optional[str]:
 def parse_pdf(file_obj) -> str:
     """Parse uploaded PDF file and extract text content."""
     try:
-        pdf_reader = PyPDF2.PdfReader(file_obj)
-        text_content = ""
-        for page in pdf_reader.pages:
-            text_content += page.extract_text()
-        return text_content
+        # Open from in-memory bytes rather than a file path
+        pdf_document = fitz.open(stream=file_obj.read(), filetype="pdf")
+        try:
+            return "\n".join(page.get_text("text") for page in pdf_document)
+        finally:
+            pdf_document.close()
     except Exception as e:
         return f"Error parsing PDF: {str(e)}"
 
 
+def get_host_semaphore(url: str) -> threading.BoundedSemaphore:
+    """Get the semaphore limiting concurrent requests to the host of the given URL."""
+    host = urlparse(url).netloc
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(
+                MAX_REQUESTS_PER_HOST)
+        return _host_semaphores[host]
+
+
 def safe_request(url: str, timeout: int = 15) -> Optional[requests.Response]:
     """Make a safe HTTP request with error handling."""
-    # Add standard headers to mimic a browser request
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    }
-
     # Ensure URL has http/https prefix
     if not url.startswith(('http://', 'https://')):
         url = 'https://' + url
 
     try:
-        response = requests.get(url, headers=headers, timeout=timeout)
-        if response.status_code == 200:
-            return response
-        else:
-            print(f"Request failed with status code: {response.status_code}")
-            return None
+        with get_host_semaphore(url):
+            # Stream the body so an oversized page is never loaded into memory in full
+            with SESSION.get(url, timeout=timeout, stream=True) as response:
+                if response.status_code != 200:
+                    print(f"Request failed with status code: {response.status_code}")
+                    return None
+
+                content_length = response.headers.get('Content-Length', '')
+                if content_length.isdigit() and int(content_length) > MAX_RESPONSE_BYTES:
+                    print(f"Skipping {url}: response too large ({content_length} bytes)")
+                    return None
+
+                # Read at most MAX_RESPONSE_BYTES and keep them as the response content.
+                # requests caches the body in _content once it has been read, and .content
+                # and .text are served from there; setting it here keeps both valid for the
+                # callers after the capped read. response.raw is consumed and closed by then
+                chunks = []
+                size = 0
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= MAX_RESPONSE_BYTES:
+                        break
+                response._content = b"".join(chunks)[:MAX_RESPONSE_BYTES]
+        return response
     except requests.RequestException as e:
         print(f"Request exception for {url}: {str(e)}")
         return None
 
 
+def canonical_url(url: str) -> str:
+    """Normalize a URL for duplicate detection: no fragment or trailing slash, lowercase."""
+    return urlsplit(url)._replace(fragment='').geturl().rstrip('/').lower()
+
+
+def dedupe_urls(urls: List[str]) -> List[str]:
+    """Drop URLs that point at the same page as an earlier one, keeping order."""
+    seen = set()
+    unique = []
+    for url in urls:
+        key = canonical_url(url)
+        if key not in seen:
+            seen.add(key)
+            unique.append(url)
+    return unique
+
+
+def fetch_all(urls: List[str]) -> List[Optional[requests.Response]]:
+    """Fetch several URLs concurrently, returning the responses (or None) in input order."""
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(urls))) as executor:
+        return list(executor.map(safe_request, urls))
+
+
+def is_live_page(url: str, timeout: int = 5) -> bool:
+    """Check with a HEAD request whether a candidate path serves its own page.
+
+    Only paths that are gone (404/410), redirect to the site root or fail to connect
+    are rejected. Any other status gets the benefit of the doubt, since servers and
+    CDNs often refuse HEAD (403, 405, 501, ...) for pages a GET would return."""
+    try:
+        with get_host_semaphore(url):
+            response = SESSION.head(url, allow_redirects=True, timeout=timeout)
+    except requests.RequestException:
+        return False
+    if response.status_code in (404, 410):
+        return False
+    return urlparse(response.url).path not in ('', '/')
+
+
+def probe_urls(urls: List[str]) -> List[str]:
+    """Return the candidate URLs that pass is_live_page, probed concurrently and kept in order."""
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(urls))) as executor:
+        live = list(executor.map(is_live_page, urls))
+    return [url for url, is_live in zip(urls, live) if is_live]
+
+
 def extract_leadership_info(soup: BeautifulSoup, url: str) -> str:
     """Extract leadership information from website with improved detection."""
-    leadership_info = ""
+    leadership_parts = []
 
     # Method 1: Check for team/about/leadership pages
-    leadership_keywords = ['leadership', 'team', 'management',
-                           'executives', 'board', 'directors', 'founders']
     leadership_links = []
+    seen_urls = set()
 
     # Find links that might contain leadership info
     for a_tag in soup.find_all('a', href=True):
         href = a_tag.get('href')
-        link_text = a_tag.get_text().strip().lower()
+        link_text = a_tag.get_text().strip()
 
         # Check for leadership-related keywords in link text or href
-        if any(keyword in link_text or keyword in href.lower() for keyword in leadership_keywords):
+        if RE_LEADERSHIP_LINK.search(link_text) or RE_LEADERSHIP_LINK.search(href):
             # Handle relative and absolute URLs
             if href.startswith('/'):
                 full_url = '/'.join(url.split('/')[:3]) + href
@@ -81,21 +234,27 @@ def extract_leadership_info(soup: BeautifulSoup, url: str) -> str:
             else:
                 full_url = href
 
+            # Skip links to a page we already have, e.g. the same page linked from nav and body
+            canonical = canonical_url(full_url)
+            if canonical in seen_urls:
+                continue
+            seen_urls.add(canonical)
             leadership_links.append((full_url, link_text))
 
-    # Visit leadership pages to extract information
+    # Visit leadership pages to extract information, fetching them concurrently
     # Limit to first 3 to avoid too many requests
-    for leader_url, link_text in leadership_links[:3]:
+    leadership_links = leadership_links[:3]
+    leader_responses = fetch_all([leader_url for leader_url, _ in leadership_links])
+
+    for (leader_url, link_text), leader_response in zip(leadership_links, leader_responses):
+        print(f"Checking leadership page: {leader_url}")
         try:
-            print(f"Checking leadership page: {leader_url}")
-            leader_response = safe_request(leader_url)
             if leader_response:
                 leader_soup = BeautifulSoup(
-                    leader_response.content, 'html.parser')
+                    leader_response.content, HTML_PARSER)
 
                 # Look for profiles - often in cards or list items
-                profiles = leader_soup.find_all(['div', 'li'], class_=re.compile(
-                    r'(profile|card|member|team-member|executive)', re.I))
+                profiles = leader_soup.find_all(['div', 'li'], class_=RE_PROFILE_CLASS)
 
                 for profile in profiles:
                     # Extract name (usually in headings)
@@ -104,7 +263,7 @@ def extract_leadership_info(soup: BeautifulSoup, url: str) -> str:
 
                     # Extract title/role (often in paragraph or specific class)
                     title_elem = profile.find(
-                        ['p', 'span', 'div'], class_=re.compile(r'(title|role|position)', re.I))
+                        ['p', 'span', 'div'], class_=RE_ROLE_CLASS)
                     if not title_elem:
                         # Try the first paragraph if no specific title element
                         title_elem = profile.find('p')
@@ -119,23 +278,18 @@ def extract_leadership_info(soup: BeautifulSoup, url: str) -> str:
 
                     # Only add if we found both name and title
                     if name and title:
-                        leadership_info += f"{name} - {title}\n"
+                        leadership_parts.append(f"{name} - {title}\n")
                         if bio:
-                            leadership_info += f"Bio: {bio}\n"
-                        leadership_info += "\n"
-
-            # Add a small delay to avoid rate limiting
-            time.sleep(0.5)
+                            leadership_parts.append(f"Bio: {bio}\n")
+                        leadership_parts.append("\n")
 
         except Exception as e:
             print(f"Error processing leadership page {leader_url}: {str(e)}")
 
     # Method 2: Look for leadership sections on the main page
-    if not leadership_info:
-        team_sections = soup.find_all(['section', 'div'], class_=re.compile(
-            r'(team|leadership|management|executives)', re.I))
-        team_sections.extend(soup.find_all(['section', 'div'], id=re.compile(
-            r'(team|leadership|management|executives)', re.I)))
+    if not leadership_parts:
+        team_sections = soup.find_all(['section', 'div'], class_=RE_TEAM_SECTION)
+        team_sections.extend(soup.find_all(['section', 'div'], id=RE_TEAM_SECTION))
 
         for section in team_sections:
             # Extract all headings and following paragraphs
@@ -146,9 +300,9 @@ def extract_leadership_info(soup: BeautifulSoup, url: str) -> str:
                 title = title_elem.get_text().strip() if title_elem else ""
 
                 if name and title:
-                    leadership_info += f"{name} - {title}\n"
+                    leadership_parts.append(f"{name} - {title}\n")
 
-    return leadership_info
+    return "".join(leadership_parts)
 
 
 def extract_job_postings(url: str) -> str:
@@ -156,24 +310,22 @@ def extract_job_postings(url: str) -> str:
     base_url = '/'.join(url.split('/')[:3])
     careers_paths = ['/careers', '/jobs',
                      '/work-with-us', '/join-us', '/company/careers']
-    job_content = ""
+    job_parts = []
 
-    # Try each common careers path
-    for path in careers_paths:
-        careers_url = base_url + path
+    # Probe the common careers paths with cheap HEAD requests, then GET the live ones in
+    # order, one at a time, so no page body is downloaded after the first one used
+    for careers_url in probe_urls([base_url + path for path in careers_paths]):
+        response = safe_request(careers_url)
         try:
-            response = safe_request(careers_url)
             if not response:
                 continue
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(response.content, HTML_PARSER)
 
             # Look for job listings
             job_listings = []
-            job_elements = soup.find_all(['div', 'li'], class_=re.compile(
-                r'(job|position|opening|vacancy)', re.I))
-            job_elements.extend(soup.find_all(['div', 'li'], id=re.compile(
-                r'(job|position|opening|vacancy)', re.I)))
+            job_elements = soup.find_all(['div', 'li'], class_=RE_JOB_LISTING)
+            job_elements.extend(soup.find_all(['div', 'li'], id=RE_JOB_LISTING))
 
             for job_elem in job_elements:
                 # Extract job title
@@ -182,7 +334,7 @@ def extract_job_postings(url: str) -> str:
 
                 # Extract job description/requirements if available
                 desc_elem = job_elem.find(
-                    ['p', 'div'], class_=re.compile(r'(description|summary)', re.I))
+                    ['p', 'div'], class_=RE_JOB_DESCRIPTION_CLASS)
                 job_desc = desc_elem.get_text().strip() if desc_elem else ""
 
                 if job_title:
@@ -190,19 +342,24 @@ def extract_job_postings(url: str) -> str:
                         "title": job_title,
                         "description": job_desc
                     })
+                    # Only the first 10 jobs are reported, so stop collecting there
+                    if len(job_listings) == 10:
+                        break
 
             # If we found job listings, format them
             if job_listings:
-                job_content += f"## Job Postings from {careers_url}:\n\n"
-                for job in job_listings[:10]:  # Limit to 10 jobs
-                    job_content += f"- {job['title']}\n"
+                job_parts.append(f"## Job Postings from {careers_url}:\n\n")
+                for job in job_listings:
+                    job_parts.append(f"- {job['title']}\n")
                     if job['description']:
-                        job_content += f"  Description: {job['description'][:200]}...\n"
+                        job_parts.append(f"  Description: {job['description'][:200]}...\n")
                 break  # Stop after finding a valid careers page
 
         except Exception as e:
             print(f"Error processing careers page {careers_url}: {str(e)}")
 
+    job_content = "".join(job_parts)
+
     # If we couldn't find job listings, check if company has jobs on LinkedIn, Indeed, etc.
     if not job_content:
         job_content = "No job postings found on company website. Consider checking LinkedIn, Indeed, or Glassdoor for job postings that would reveal technology stack and skill requirements."
@@ -215,54 +372,53 @@ def extract_financial_info(url: str) -> str:
     base_url = '/'.join(url.split('/')[:3])
     investor_paths = ['/investor-relations', '/investors',
                       '/financials', '/annual-report', '/ir']
-    financial_content = ""
+    financial_parts = []
 
-    # Try each common investor relations path
-    for path in investor_paths:
-        investor_url = base_url + path
+    # Probe the common investor relations paths with cheap HEAD requests, then GET the
+    # live ones in order, one at a time, so no page body is downloaded after the first one used
+    for investor_url in probe_urls([base_url + path for path in investor_paths]):
+        response = safe_request(investor_url)
         try:
-            response = safe_request(investor_url)
             if not response:
                 continue
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(response.content, HTML_PARSER)
 
             # Look for financial reports and filings
-            financial_content += f"## Financial Information from {investor_url}:\n\n"
+            financial_parts.append(f"## Financial Information from {investor_url}:\n\n")
 
             # Look for links to annual reports, 10-K, etc.
             report_links = []
             for a_tag in soup.find_all('a', href=True):
                 href = a_tag.get('href')
-                text = a_tag.get_text().lower()
+                text = a_tag.get_text()
 
-                if any(term in text or term in href.lower() for term in ['annual report', '10-k', '10k', 'financial report', 'earnings']):
+                # One regex scan per field replaces a substring test per keyword
+                if RE_FINANCIAL_LINK.search(text) or RE_FINANCIAL_LINK.search(href):
                     report_links.append({
-                        "text": a_tag.get_text().strip(),
+                        "text": text.strip(),
                         "url": href if href.startswith('http') else base_url + href if href.startswith('/') else base_url + '/' + href
                     })
 
             # Add found report links
             if report_links:
-                financial_content += "### Financial Reports:\n\n"
+                financial_parts.append("### Financial Reports:\n\n")
                 for link in report_links:
-                    financial_content += f"- [{link['text']}]({link['url']})\n"
+                    financial_parts.append(f"- [{link['text']}]({link['url']})\n")
 
             # Extract any visible financial data on the page
-            financial_sections = soup.find_all(['section', 'div'], class_=re.compile(
-                r'(financial|earnings|results|performance)', re.I))
-            financial_sections.extend(soup.find_all(['section', 'div'], id=re.compile(
-                r'(financial|earnings|results|performance)', re.I)))
+            financial_sections = soup.find_all(['section', 'div'], class_=RE_FINANCIAL_SECTION)
+            financial_sections.extend(soup.find_all(['section', 'div'], id=RE_FINANCIAL_SECTION))
 
             if financial_sections:
-                financial_content += "\n### Financial Highlights:\n\n"
+                financial_parts.append("\n### Financial Highlights:\n\n")
                 for section in financial_sections:
                     # Get all paragraphs in this section
                     paragraphs = section.find_all('p')
                     for p in paragraphs:
                         text = p.get_text().strip()
                         if text and len(text) > 20:  # Only substantial paragraphs
-                            financial_content += f"- {text}\n"
+                            financial_parts.append(f"- {text}\n")
 
             break  # Stop after finding a valid investor relations page
 
@@ -270,15 +426,17 @@ def extract_financial_info(url: str) -> str:
             print(
                 f"Error processing investor relations page {investor_url}: {str(e)}")
 
-    # If we couldn't find financial information
-    if not financial_content or financial_content == f"## Financial Information from {investor_url}:\n\n":
+    financial_content = "".join(financial_parts)
+
+    # If we couldn't find financial information (nothing beyond the page header)
+    if len(financial_parts) <= 1:
         # Check if it's likely a public company
         is_public = False
         try:
             # Common stock tickers for large companies
             stock_check_url = f"https://finance.yahoo.com/quote/{url.split('.')[-2].split('/')[-1]}"
             stock_response = safe_request(stock_check_url)
-            if stock_response and "not found" not in stock_response.text.lower():
+            if stock_response and b"not found" not in stock_response.content.lower():
                 is_public = True
         except:
             pass
@@ -291,13 +449,22 @@ def extract_financial_info(url: str) -> str:
     return financial_content
 
 
-def scrape_website_content(url: str) -> str:
-    """Scrape the content of the provided URL with improved structure."""
+def fetch_soup(url: str) -> Optional[BeautifulSoup]:
+    """Fetch and parse a page, returning None if it could not be accessed."""
     response = safe_request(url)
     if not response:
-        return f"Could not access {url}"
+        return None
+    return BeautifulSoup(response.content, HTML_PARSER)
+
 
-    soup = BeautifulSoup(response.content, 'html.parser')
+def scrape_website_sections(url: str, soup: Optional[BeautifulSoup] = None) -> Optional[Dict[str, str]]:
+    """Scrape the provided URL into content sections keyed by section marker, or None if inaccessible.
+
+    Pass the already parsed page as `soup` to avoid fetching it again; it is modified in place."""
+    if soup is None:
+        soup = fetch_soup(url)
+    if soup is None:
+        return None
 
     # Remove unwanted elements
     for unwanted in soup(['script', 'style', 'nav', 'footer', 'iframe']):
@@ -312,25 +479,33 @@ def scrape_website_content(url: str) -> str:
     meta_content = meta_description['content'] if meta_description and 'content' in meta_description.attrs else ''
 
     # Extract all headings for structure
-    headings_text = ""
+    heading_lines = []
     for h_tag in soup.find_all(['h1', 'h2', 'h3']):
         heading_text = h_tag.get_text().strip()
         if heading_text:
-            headings_text += f"{heading_text}\n"
+            heading_lines.append(f"{heading_text}\n")
 
     # Extract main content sections
-    main_content = ""
+    main_paragraphs = []
     main_tags = ['main', 'article', 'section', 'div']
-    main_classes = ['content', 'main', 'body', 'container', 'wrapper']
 
-    # Try to find the main content area
+    # Collect the candidate containers in one traversal, grouped by tag in document order
+    candidates = {tag: [] for tag in main_tags}
+    for element in soup.find_all(main_tags, class_=True):
+        candidates[element.name].append(element)
+
+    # Try to find the main content area, by tag and then class priority
     main_element = None
+    text_lengths = {}
     for tag in main_tags:
-        for class_name in main_classes:
-            elements = soup.find_all(tag, class_=re.compile(class_name, re.I))
-            for element in elements:
-                # Choose elements with substantial content
-                if len(element.get_text().strip()) > 200:
+        for class_pattern in RE_MAIN_CONTENT_CLASSES:
+            for element in candidates[tag]:
+                if not class_pattern.search(' '.join(element.get('class', []))):
+                    continue
+                # Choose elements with substantial content, measuring each one only once
+                if id(element) not in text_lengths:
+                    text_lengths[id(element)] = len(element.get_text().strip())
+                if text_lengths[id(element)] > 200:
                     main_element = element
                     break
             if main_element:
@@ -338,34 +513,33 @@ def scrape_website_content(url: str) -> str:
         if main_element:
             break
 
-    # If we found a main content element, extract paragraphs from it
-    if main_element:
-        for p in main_element.find_all('p'):
-            p_text = p.get_text().strip()
-            if p_text:
-                main_content += f"{p_text}\n\n"
-    else:
-        # Fallback to all paragraphs on the page
-        for p in soup.find_all('p'):
-            p_text = p.get_text().strip()
-            if p_text and len(p_text) > 50:  # Only substantial paragraphs
-                main_content += f"{p_text}\n\n"
+    # If we found a main content element, extract paragraphs from it,
+    # otherwise fall back to the substantial paragraphs on the whole page
+    min_length = 0 if main_element else 50
+    main_length = 0
+    for p in (main_element or soup).find_all('p'):
+        p_text = p.get_text().strip()
+        if p_text and len(p_text) > min_length:
+            main_paragraphs.append(f"{p_text}\n\n")
+            main_length += len(p_text) + 2
+            # Stop once there is more text than the main content keeps
+            if main_length >= MAX_MAIN_CONTENT_CHARS:
+                break
 
     # Extract leadership information
     leadership_info = extract_leadership_info(soup, url)
 
     # Try to extract company mission/about content
-    about_content = ""
-    about_sections = soup.find_all(['section', 'div'], class_=re.compile(
-        r'(about|mission|vision|values)', re.I))
+    about_paragraphs = []
+    about_sections = soup.find_all(['section', 'div'], class_=RE_ABOUT_SECTION)
     about_sections.extend(soup.find_all(
-        ['section', 'div'], id=re.compile(r'(about|mission|vision|values)', re.I)))
+        ['section', 'div'], id=RE_ABOUT_SECTION))
 
     for section in about_sections:
         for p in section.find_all('p'):
             p_text = p.get_text().strip()
             if p_text:
-                about_content += f"{p_text}\n\n"
+                about_paragraphs.append(f"{p_text}\n\n")
 
     # Extract job postings data
     job_postings = extract_job_postings(url)
@@ -373,35 +547,63 @@ def scrape_website_content(url: str) -> str:
     # Extract financial information
     financial_info = extract_financial_info(url)
 
-    # Combine extracted content with clear section markers
-    content = f"""
-COMPANY NAME: {title_text}
+    headings_text = "".join(heading_lines)
+    main_content = "".join(main_paragraphs)
+    about_content = "".join(about_paragraphs)
+
+    return {
+        "COMPANY NAME": title_text,
+        "COMPANY DESCRIPTION": meta_content,
+        "MAIN HEADINGS": headings_text,
+        "ABOUT/MISSION": about_content,
+        "LEADERSHIP INFORMATION": leadership_info,
+        "JOB POSTINGS (TECH STACK INDICATORS)": job_postings,
+        "FINANCIAL INFORMATION": financial_info,
+        "MAIN CONTENT": main_content[:MAX_MAIN_CONTENT_CHARS]
+    }
+
 
-COMPANY DESCRIPTION: {meta_content}
+def format_sections(sections: Dict[str, str]) -> str:
+    """Combine scraped sections into text with clear section markers."""
+    return f"""
+COMPANY NAME: {sections['COMPANY NAME']}
+
+COMPANY DESCRIPTION: {sections['COMPANY DESCRIPTION']}
 
 MAIN HEADINGS:
-{headings_text}
+{sections['MAIN HEADINGS']}
 
 ABOUT/MISSION:
-{about_content}
+{sections['ABOUT/MISSION']}
 
 LEADERSHIP INFORMATION:
-{leadership_info}
+{sections['LEADERSHIP INFORMATION']}
 
 JOB POSTINGS (TECH STACK INDICATORS):
-{job_postings}
+{sections['JOB POSTINGS (TECH STACK INDICATORS)']}
 
 FINANCIAL INFORMATION:
-{financial_info}
+{sections['FINANCIAL INFORMATION']}
 
 MAIN CONTENT:
-{main_content[:3000]}
+{sections['MAIN CONTENT']}
 """
-    return content
 
 
-def find_press_releases(company_url: str) -> str:
-    """Find and scrape press releases or news from the company website."""
+def scrape_website_content(url: str, soup: Optional[BeautifulSoup] = None) -> str:
+    """Scrape the content of the provided URL with improved structure."""
+    sections = scrape_website_sections(url, soup)
+    if sections is None:
+        return f"Could not access {url}"
+    return format_sections(sections)
+
+
+def find_press_releases(company_url: str, homepage_soup: Optional[BeautifulSoup] = None,
+                        fetch_homepage: bool = True) -> str:
+    """Find and scrape press releases or news from the company website.
+
+    Pass the already parsed homepage as `homepage_soup` to avoid fetching it again, or
+    `fetch_homepage=False` when it could not be fetched to only try the common paths."""
     base_url = '/'.join(company_url.split('/')[:3])
 
     # Common paths for press/news pages
@@ -412,16 +614,15 @@ def find_press_releases(company_url: str) -> str:
     news_links = []
 
     # First, check if there are links to news/press on the homepage
-    homepage_response = safe_request(company_url)
-    if homepage_response:
-        homepage_soup = BeautifulSoup(homepage_response.content, 'html.parser')
-
+    if homepage_soup is None and fetch_homepage:
+        homepage_soup = fetch_soup(company_url)
+    if homepage_soup is not None:
         # Look for news/press links
         for a_tag in homepage_soup.find_all('a', href=True):
             href = a_tag.get('href')
-            text = a_tag.get_text().lower()
+            text = a_tag.get_text()
 
-            if any(keyword in text or keyword in href.lower() for keyword in ['news', 'press', 'blog', 'media', 'announcement']):
+            if RE_PRESS_LINK.search(text) or RE_PRESS_LINK.search(href):
                 # Handle relative and absolute URLs
                 if href.startswith('/'):
                     full_url = base_url + href
@@ -437,21 +638,24 @@ def find_press_releases(company_url: str) -> str:
         news_links.append(base_url + path)
 
     press_content = ""
-    # Try each path (limit to 3 to avoid too many requests)
-    for i, press_url in enumerate(news_links[:3]):
+    # Try each distinct path (limit to 3 to avoid too many requests), fetching them concurrently.
+    # Only the first page with articles is used, so the other requests are wasted when an
+    # early candidate succeeds; that costs at most 2 extra requests to the site, in exchange
+    # for not waiting on the candidates one after another when the early ones fail
+    news_links = dedupe_urls(news_links)[:3]
+    press_responses = fetch_all(news_links)
+
+    for press_url, response in zip(news_links, press_responses):
+        print(f"Checking press/news page: {press_url}")
         try:
-            print(f"Checking press/news page: {press_url}")
-            response = safe_request(press_url)
-
             if response:
-                press_soup = BeautifulSoup(response.content, 'html.parser')
+                press_soup = BeautifulSoup(response.content, HTML_PARSER)
 
                 # Extract article titles and contents
                 articles = []
 
                 # Look for article containers
-                article_elements = press_soup.find_all(['article', 'div'], class_=re.compile(
-                    r'(news|press|article|post|release)', re.I))
+                article_elements = press_soup.find_all(['article', 'div'], class_=RE_ARTICLE_CLASS)
 
                 # Limit to first 7 articles
                 for article in article_elements[:7]:
@@ -459,13 +663,11 @@ def find_press_releases(company_url: str) -> str:
                     title = title_elem.get_text().strip() if title_elem else ""
 
                     # Extract date if available
-                    date_elem = article.find(['time', 'span', 'div'], class_=re.compile(
-                        r'(date|time|published)', re.I))
+                    date_elem = article.find(['time', 'span', 'div'], class_=RE_DATE_CLASS)
                     date = date_elem.get_text().strip() if date_elem else ""
 
                     # Extract summary
-                    summary_elem = article.find(['p', 'div'], class_=re.compile(
-                        r'(summary|excerpt|description)', re.I))
+                    summary_elem = article.find(['p', 'div'], class_=RE_SUMMARY_CLASS)
                     if not summary_elem:
                         # Try first paragraph if no specific summary element
                         summary_elem = article.find('p')
@@ -501,63 +703,71 @@ def find_press_releases(company_url: str) -> str:
                         articles) + "\n\n"
                     break  # Stop after finding one valid press page with articles
 
-            # Add a small delay to avoid rate limiting
-            time.sleep(0.5)
-
         except Exception as e:
             print(f"Error processing press page {press_url}: {str(e)}")
 
     return press_content
 
 
+def parse_sections(content: str) -> Dict[str, str]:
+    """Split scraped website content into its marked sections in a single pass."""
+    sections = {}
+    markers = list(RE_SECTION_MARKER.finditer(content))
+    for i, marker in enumerate(markers):
+        end = markers[i + 1].start() if i + 1 < len(markers) else len(content)
+        sections[marker.group(1)] = content[marker.end():end].strip()
+    return sections
+
+
+@lru_cache(maxsize=1)
+def get_embedding_model() -> SentenceTransformer:
+    """Load the sentence embedding model once and reuse it for every call."""
+    return SentenceTransformer('all-MiniLM-L6-v2')
+
+
+def get_embedding_texts(company_data: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """Return the names and texts of the company data sections worth embedding."""
+    # Extract structured content from the company_data
+    content = company_data.get("content", "")
+    press_content = company_data.get("press_content", "")
+
+    # Reuse the sections kept by scrape_company_data, or parse the text with one scan
+    parsed_sections = company_data.get("sections")
+    if parsed_sections is None:
+        parsed_sections = parse_sections(content)
+    sections = {name: parsed_sections.get(marker, "").strip()
+                for name, marker in SECTION_MARKERS.items()}
+    sections["press"] = press_content
+
+    # Collect each non-empty section, truncating long content for embedding efficiency
+    names = []
+    texts = []
+    for section_name, section_content in sections.items():
+        # Only embed substantial content
+        if section_content and len(section_content) > 50:
+            names.append(section_name)
+            texts.append(section_content[:5000])
+
+    # Also create a combined embedding for general similarity matching
+    combined_text = f"{sections['company_description']} {sections['about']}".strip()
+    if combined_text:
+        names.append("combined")
+        texts.append(combined_text[:5000])
+
+    return names, texts
+
+
 def generate_structured_embeddings(company_data: Dict[str, Any]) -> Dict[str, List[float]]:
-    """Generate separate embeddings for different sections of company data."""
+    """Generate separate unit-length embeddings for different sections of company data."""
     try:
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        embeddings = {}
-
-        # Extract structured content from the company_data
-        content = company_data.get("content", "")
-        press_content = company_data.get("press_content", "")
-
-        # Extract specific sections using regex
-        sections = {
-            "company_description": re.search(r"COMPANY DESCRIPTION: (.*?)(?=\n\n)", content, re.DOTALL),
-            "about": re.search(r"ABOUT/MISSION:\n(.*?)(?=\n\nLEADERSHIP INFORMATION)", content, re.DOTALL),
-            "leadership": re.search(r"LEADERSHIP INFORMATION:\n(.*?)(?=\n\nJOB POSTINGS)", content, re.DOTALL),
-            "jobs": re.search(r"JOB POSTINGS \(TECH STACK INDICATORS\):\n(.*?)(?=\n\nFINANCIAL INFORMATION)", content, re.DOTALL),
-            "financial": re.search(r"FINANCIAL INFORMATION:\n(.*?)(?=\n\nMAIN CONTENT)", content, re.DOTALL),
-            "main_content": re.search(r"MAIN CONTENT:\n(.*?)$", content, re.DOTALL),
-            "press": press_content
-        }
-
-        # Generate embeddings for each non-empty section
-        for section_name, section_match in sections.items():
-            section_content = section_match.group(
-                1).strip() if section_match else ""
-            if section_name == "press":
-                section_content = press_content
-
-            # Only embed substantial content
-            if section_content and len(section_content) > 50:
-                # Truncate long content for embedding efficiency
-                if len(section_content) > 5000:
-                    section_content = section_content[:5000]
-                embeddings[section_name] = model.encode(
-                    section_content).tolist()
-
-        # Also create a combined embedding for general similarity matching
-        combined_text = (
-            sections.get("company_description", "").group(
-                1) if sections.get("company_description") else ""
-        ) + " " + (
-            sections.get("about", "").group(1) if sections.get("about") else ""
-        )
-        if combined_text:
-            embeddings["combined"] = model.encode(
-                combined_text[:5000]).tolist()
-
-        return embeddings
+        names, texts = get_embedding_texts(company_data)
+        if not texts:
+            return {}
+
+        # Encode every section in one batch instead of one model call per section
+        vectors = get_embedding_model().encode(
+            texts, batch_size=8, normalize_embeddings=True)
+        return {name: vector.tolist() for name, vector in zip(names, vectors)}
 
     except Exception as e:
         print(f"Error generating structured embeddings: {str(e)}")
@@ -568,39 +778,115 @@ def generate_embedding(text: str) -> List[float]:
     """Generate an embedding for the given text using a pre-trained model.
     This is a simple method for backward compatibility."""
     try:
-        model = SentenceTransformer('all-MiniLM-L6-v2')
+        model = get_embedding_model()
         # Limit text length for embedding to avoid issues
         if len(text) > 5000:
             text = text[:5000]
-        embedding = model.encode(text).tolist()
+        embedding = model.encode(text, normalize_embeddings=True).tolist()
         return embedding
     except Exception as e:
         print(f"Error generating embedding: {str(e)}")
         return []
 
 
-def scrape_company_data(company_url: str) -> Dict[str, Any]:
-    """Scrape comprehensive company information from the provided URL."""
+def fetch_company_content(company_url: str) -> Dict[str, Any]:
+    """Scrape the company website and press pages, without computing embeddings."""
     print(f"Scraping company data from: {company_url}")
 
-    # Main website content
-    content = scrape_website_content(company_url)
+    # Fetch and parse the homepage once for both the content and the press link search
+    homepage_soup = fetch_soup(company_url)
 
-    # Press releases/news
-    press_content = find_press_releases(company_url)
+    # Press releases/news; runs first because scrape_website_sections strips the
+    # nav and footer, where press links usually live. If the homepage is unreachable,
+    # only the common press paths are tried instead of fetching it again
+    press_content = find_press_releases(
+        company_url, homepage_soup, fetch_homepage=False)
+
+    # Main website content, kept both as sections and as the combined text view
+    if homepage_soup is None:
+        sections = {}
+        content = f"Could not access {company_url}"
+    else:
+        sections = scrape_website_sections(company_url, homepage_soup)
+        content = format_sections(sections)
 
     # Create the base company data dictionary
     company_data = {
         "url": company_url,
         "content": content,
-        "press_content": press_content
+        "press_content": press_content,
+        # Short previews for the debug view, so it never slices the full content on rerun
+        "content_preview": content[:DEBUG_PREVIEW_CHARS],
+        "press_preview": press_content[:DEBUG_PREVIEW_CHARS],
+        # Content by section marker, so consumers never re-parse the text view
+        "sections": sections
     }
 
+    return company_data
+
+
+def scrape_company_data(company_url: str) -> Dict[str, Any]:
+    """Scrape comprehensive company information from the provided URL."""
+    company_data = fetch_company_content(company_url)
+
     # Generate structured embeddings
     company_data["embeddings"] = generate_structured_embeddings(company_data)
 
-    # Keep a single embedding for backward compatibility
-    company_data["embedding"] = company_data["embeddings"].get(
-        "combined", generate_embedding(content))
+    # Keep a single embedding for backward compatibility, only encoding the full
+    # content when there is no combined embedding to reuse
+    company_data["embedding"] = company_data["embeddings"].get("combined")
+    if company_data["embedding"] is None:
+        company_data["embedding"] = generate_embedding(company_data["content"])
 
     return company_data
+
+
+def scrape_many(company_urls: List[str]) -> List[Dict[str, Any]]:
+    """Scrape several companies concurrently, then embed all of them in one batch.
+
+    Returns the same company data as scrape_company_data, in the order of the URLs."""
+    if not company_urls:
+        return []
+
+    # Scrape the websites concurrently; the per-host limit still applies to every request
+    with ThreadPoolExecutor(max_workers=min(MAX_COMPANY_WORKERS, len(company_urls))) as executor:
+        companies = list(executor.map(fetch_company_content, company_urls))
+
+    # Flatten every company's sections into one list, where a None name stands for the
+    # backward compatible full content embedding of a company without a combined one
+    owners = []
+    names = []
+    texts = []
+    for index, company_data in enumerate(companies):
+        company_names, company_texts = get_embedding_texts(company_data)
+        if "combined" not in company_names:
+            company_names.append(None)
+            company_texts.append(company_data["content"][:5000])
+        owners.extend([index] * len(company_names))
+        names.extend(company_names)
+        texts.extend(company_texts)
+
+    for company_data in companies:
+        company_data["embeddings"] = {}
+        company_data["embedding"] = []
+
+    # Encode all sections of all companies with a single model call and scatter them back
+    try:
+        vectors = get_embedding_model().encode(
+            texts, batch_size=32, normalize_embeddings=True)
+    except Exception as e:
+        print(f"Error generating structured embeddings: {str(e)}")
+        for company_data in companies:
+            company_data["embeddings"] = {"error": str(e)}
+        return companies
+
+    for index, name, vector in zip(owners, names, vectors):
+        if name is None:
+            companies[index]["embedding"] = vector.tolist()
+        else:
+            companies[index]["embeddings"][name] = vector.tolist()
+    for company_data in companies:
+        if "combined" in company_data["embeddings"]:
+            company_data["embedding"] = company_data["embeddings"]["combined"]
+
+    return companies
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app modules import each other by bare name, as streamlit runs them from app/
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
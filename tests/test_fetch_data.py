@@ -0,0 +1,15 @@
+from fetch_data import extract_key_differentiators, _KNOWN_COMPANIES
+
+
+def test_known_company_found_case_insensitively():
+    assert extract_key_differentiators("pagerduty inc") == _KNOWN_COMPANIES["PagerDuty"]
+
+
+def test_earlier_table_entry_wins_when_two_names_match():
+    # HubSpot is listed before Microsoft Dynamics, although it appears later in the name
+    assert extract_key_differentiators("Microsoft Dynamics 365 by HubSpot") == _KNOWN_COMPANIES["HubSpot"]
+    assert extract_key_differentiators("SAPient Oracle") == _KNOWN_COMPANIES["Oracle"]
+
+
+def test_unknown_company():
+    assert "not specifically identified" in extract_key_differentiators("Acme Corp")
@@ -0,0 +1,24 @@
+import llm
+
+
+def test_truncate_tokens_falls_back_to_characters_and_retries_the_tokenizer(monkeypatch):
+    def fail(model):
+        raise OSError("download failed")
+
+    monkeypatch.setattr(llm, "_encoding", None)
+    monkeypatch.setattr(llm.tiktoken, "encoding_for_model", fail)
+    assert llm.get_encoding() is None
+    # Roughly 4 characters per token when the tokenizer is unavailable
+    assert llm.truncate_tokens("x" * 100, 10) == "x" * 40
+
+    # The failure is not cached, so the next call loads the tokenizer
+    class FakeEncoding:
+        def encode(self, text, disallowed_special=()):
+            return list(text)
+
+        def decode(self, tokens):
+            return "".join(tokens)
+
+    monkeypatch.setattr(llm.tiktoken, "encoding_for_model", lambda model: FakeEncoding())
+    assert isinstance(llm.get_encoding(), FakeEncoding)
+    assert llm.truncate_tokens("x" * 100, 10) == "x" * 10